@@ -0,0 +1,122 @@
+"""
+    Analytics Module
+
+    This module derives career metrics from the fight histories of many fighters.
+    Every bout of every fighter is put in one long DataFrame, so fight time, finish rates,
+    average duration and rolling form are computed as grouped, vectorized operations over
+    the whole roster instead of a loop per fighter.
+"""
+
+from typing import Iterable
+import numpy as np
+import pandas as pd
+from bout_index import method_category
+
+ROUND_SECONDS = 5 * 60
+FINISH_CATEGORIES = ['ko/tko', 'submission']
+BOUT_COLUMNS = ['fighter_id', 'name', 'bout', 'date', 'opponent', 'opponent_id', 'result',
+                'method', 'round', 'time', 'event']
+
+
+def bouts_frame(fighters: Iterable) -> pd.DataFrame:
+    """
+        Gets every bout of the fighters as one DataFrame in chronological order, with
+        `bout` counting each fighter's fights from 0 for their first.
+        Accepts FighterData or CompactFighter instances.
+    """
+    columns = {column: [] for column in BOUT_COLUMNS}
+    for fighter in fighters:
+        history = fighter.get_fight_history()
+        count = len(history)
+        columns['fighter_id'].extend([fighter.fighter_id] * count)
+        columns['name'].extend([fighter.get_name()] * count)
+        columns['bout'].extend(range(count - 1, -1, -1))  # ESPN lists the latest fight first
+        columns['date'].extend(history.dates)
+        columns['opponent'].extend(history.opponents)
+        columns['opponent_id'].extend(history.opponent_ids)
+        columns['result'].extend(history.results)
+        columns['method'].extend(history.methods)
+        columns['round'].extend(history.rounds)
+        columns['time'].extend(history.times)
+        columns['event'].extend(history.events)
+    frame = pd.DataFrame(columns)
+    frame['date'] = pd.to_datetime(frame['date'], format='%b %d, %Y', errors='coerce')
+    frame = frame.sort_values(['fighter_id', 'bout'], kind='stable', ignore_index=True)
+    return add_derived_columns(frame)
+
+
+def add_derived_columns(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+        Adds the seconds each bout lasted, the method category, and whether the bout was a
+        win, a finish win or a finish loss. Missing rounds or times give NaN seconds.
+    """
+    end_round = pd.to_numeric(frame['round'], errors='coerce')
+    clock = frame['time'].astype(str).str.partition(':')
+    minutes = pd.to_numeric(clock[0], errors='coerce')
+    seconds = pd.to_numeric(clock[2], errors='coerce')
+    frame['seconds'] = (end_round - 1) * ROUND_SECONDS + minutes * 60 + seconds
+    # Few methods are distinct, so each one is categorized once and broadcast back
+    codes, methods = pd.factorize(frame['method'])
+    categories = np.array([method_category(method) for method in methods] + ['other'])
+    frame['category'] = categories[codes]  # Code -1 (missing) picks the trailing 'other'
+    finish = frame['category'].isin(FINISH_CATEGORIES)
+    frame['win'] = frame['result'] == 'W'
+    frame['finish_win'] = frame['win'] & finish
+    frame['finish_loss'] = (frame['result'] == 'L') & finish
+    return frame
+
+
+def career_summary(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+        Gets one row per fighter with their bout count, win rate, finish rate (the share of
+        wins by KO/TKO or submission), rate of being finished, and fight time in seconds.
+    """
+    frame = frame.assign(
+        ko_win=frame['win'] & (frame['category'] == 'ko/tko'),
+        submission_win=frame['win'] & (frame['category'] == 'submission'),
+        loss=frame['result'] == 'L')
+    grouped = frame.groupby('fighter_id', sort=False)
+    summary = grouped.agg(
+        name=('name', 'first'),
+        bouts=('bout', 'size'),
+        wins=('win', 'sum'),
+        losses=('loss', 'sum'),
+        finish_wins=('finish_win', 'sum'),
+        ko_wins=('ko_win', 'sum'),
+        submission_wins=('submission_win', 'sum'),
+        finish_losses=('finish_loss', 'sum'),
+        total_seconds=('seconds', 'sum'),
+        mean_seconds=('seconds', 'mean'))
+    wins = summary['wins'].where(summary['wins'] > 0)
+    summary['win_rate'] = summary['wins'] / summary['bouts']
+    summary['finish_rate'] = summary['finish_wins'] / wins
+    summary['ko_rate'] = summary['ko_wins'] / wins
+    summary['submission_rate'] = summary['submission_wins'] / wins
+    summary['finished_rate'] = \
+        summary['finish_losses'] / summary['losses'].where(summary['losses'] > 0)
+    return summary
+
+
+def rolling_form(frame: pd.DataFrame, window: int = 5) -> pd.DataFrame:
+    """
+        Adds each fighter's win rate, share of bouts won by finish and mean fight seconds
+        over the last `window` bouts up to and including each bout. Windows never cross
+        fighters.
+    """
+    grouped = frame.groupby('fighter_id', sort=False)[['win', 'finish_win', 'seconds']]
+    rolled = grouped.rolling(window, min_periods=1).mean().reset_index(level=0, drop=True)
+    return frame.assign(**{f"{column}_last_{window}": rolled[column]
+                           for column in ['win', 'finish_win', 'seconds']})
+
+
+def recent_form(frame: pd.DataFrame, window: int = 5) -> pd.DataFrame:
+    """
+        Gets one row per fighter with their win rate, share of bouts won by finish and
+        mean fight seconds over their last `window` bouts.
+    """
+    recent = frame.groupby('fighter_id', sort=False).tail(window)
+    return recent.groupby('fighter_id', sort=False).agg(
+        bouts=('bout', 'size'),
+        win_rate=('win', 'mean'),
+        finish_win_rate=('finish_win', 'mean'),
+        mean_seconds=('seconds', 'mean'))
@@ -0,0 +1,104 @@
+"""
+    Batch Module
+
+    This module loads many fighters at once. Stats and history pages are downloaded
+    concurrently by a bounded pool of workers sharing one keep-alive session.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Optional, Sequence, Set, Union
+from fighter import FighterData
+from fetcher import PageFetcher
+
+if TYPE_CHECKING:
+    from compact import CompactFighter
+
+
+class FighterBatch:
+    """
+        Loads fighters concurrently and yields them as they finish.
+
+        Attributes:
+            max_workers (int): The number of pages downloaded at the same time.
+            fetcher (PageFetcher): The fetcher shared by every fighter in the batch.
+            errors (dict): The exception raised for each fighter id that failed to load.
+            pages (tuple): The pages downloaded up front, 'stats' and/or 'history'.
+            parse_only (bool): Whether fighters parse just the subtrees the getters read.
+            compact (bool): Whether fighters are yielded as memory-bounded CompactFighters,
+                with their pages and parse trees already dropped.
+
+        Pages left out of `pages` are still fetched lazily if a getter needs them later.
+    """
+
+    def __init__(self, max_workers: int = 8,
+                 fetcher: Optional[PageFetcher] = None,
+                 pages: Sequence[str] = ('stats', 'history'),
+                 parse_only: bool = False, compact: bool = False) -> None:
+        """Initializes a batch with a worker pool of the given size"""
+        self.max_workers = max_workers
+        self.fetcher = fetcher or PageFetcher(pool_size=max_workers)
+        self.errors: Dict[str, Exception] = {}
+        self.pages = tuple(pages)
+        self.parse_only = parse_only
+        self.compact = compact
+
+    def load(self, fighter_ids: Iterable) -> Iterator[Union[FighterData, 'CompactFighter']]:
+        """
+            Fetches every fighter id, yielding each fighter once all of its requested
+            pages have been downloaded. Pages are parsed when a getter first needs them.
+            Fighters are yielded in completion order, not input order. Only a bounded
+            number of fighters are in flight so memory stays flat for long inputs.
+        """
+        pending_ids = iter(fighter_ids)
+        in_flight: Set[Future] = set()
+        owners: Dict[Future, FighterData] = {}
+        remaining: Dict[str, int] = {}
+        max_in_flight = self.max_workers * 2
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                while len(remaining) < max_in_flight:
+                    fighter_id = next(pending_ids, None)
+                    if fighter_id is None:
+                        break
+                    fighter = FighterData(fetcher=self.fetcher,
+                                          parse_only=self.parse_only)
+                    fighter.set_url_from_id(fighter_id)
+                    if fighter.fighter_id in remaining:
+                        continue  # Duplicate id already being fetched
+                    remaining[fighter.fighter_id] = len(self.pages)
+                    for page in self.pages:
+                        future = executor.submit(getattr(fighter, f'fetch_{page}'))
+                        owners[future] = fighter
+                        in_flight.add(future)
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    fighter = owners.pop(future)
+                    if fighter.fighter_id not in remaining:
+                        continue  # Another page of this fighter already failed
+                    error = future.exception()
+                    if error is not None:
+                        del remaining[fighter.fighter_id]
+                        self.errors[fighter.fighter_id] = error
+                        continue
+                    remaining[fighter.fighter_id] -= 1
+                    if remaining[fighter.fighter_id] == 0:
+                        del remaining[fighter.fighter_id]
+                        if not self.compact:
+                            yield fighter
+                            continue
+                        try:  # Compacting fetches any page not listed in pages
+                            compacted = fighter.compact()
+                        except Exception as error:  # pylint: disable=broad-except
+                            fighter.release()
+                            self.errors[fighter.fighter_id] = error
+                            continue
+                        yield compacted
+
+
+def load_many(fighter_ids: Iterable, max_workers: int = 8,
+              pages: Sequence[str] = ('stats', 'history')) -> Iterator[FighterData]:
+    """Loads many fighters concurrently, yielding them as they finish"""
+    return FighterBatch(max_workers=max_workers, pages=pages).load(fighter_ids)
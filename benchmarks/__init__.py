@@ -0,0 +1,6 @@
+"""
+    Benchmarks Package
+
+    Offline benchmarks for the scraper. Run them from the repository root with
+    `python -m benchmarks.run`.
+"""
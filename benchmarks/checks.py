@@ -0,0 +1,53 @@
+"""
+    Regression Check Module
+
+    This module checks edge cases of the extractors that the fixture pages do not cover,
+    against the results the original per-cell code gave. Each check prints ok or FAILED
+    with what was expected. Exits with status 1 if any check fails.
+
+    Usage: python -m benchmarks.checks
+"""
+
+import sys
+from typing import Any, Callable, List, Tuple
+from compact import CompactTable
+from fighter import FighterData
+
+RAGGED_STATS = [['12/30', '50%', '3'], ['4/10', '-'], ['8/20']]
+UNROUNDED_STATS = [['0.0', '1.50', '7'], ['3/4', '-', '25%'], ['2', '1']]
+
+
+def check_ragged_rows() -> List[float]:
+    """Averages a stats table whose later rows are missing cells"""
+    return FighterData().find_column_avg(RAGGED_STATS)
+
+
+def check_compact_cell_text() -> List[List[str]]:
+    """Rebuilds stats rows from a compact table, which must give back the extracted text"""
+    return CompactTable(['A', 'B', 'C'], UNROUNDED_STATS).rows()
+
+
+# Each check with the result the original code gave
+CHECKS: List[Tuple[Callable[[], Any], Any]] = [
+    (check_ragged_rows, [8.0, 50.0, 3.0]),
+    (check_compact_cell_text, UNROUNDED_STATS),
+]
+
+
+def main() -> int:
+    """Runs every check and prints the results"""
+    failures = 0
+    for check, expected in CHECKS:
+        try:
+            actual = check()
+        except Exception as error:  # pylint: disable=broad-except
+            actual = f"{type(error).__name__}: {error}"
+        passed = actual == expected
+        failures += not passed
+        status = 'ok' if passed else f"FAILED, got {actual!r} expected {expected!r}"
+        print(f"{check.__name__}: {status}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
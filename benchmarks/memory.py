@@ -0,0 +1,56 @@
+"""
+    Memory Check Module
+
+    This module checks that a compact fighter stays within the memory budget documented in
+    compact.py. Each fixture fighter is parsed, extracted and compacted while tracemalloc
+    is running, and the memory still held once the pages and parse trees are dropped is
+    compared with the budget. Exits with status 1 if any size is over budget.
+
+    Usage: python -m benchmarks.memory
+"""
+
+import gc
+import sys
+import tracemalloc
+from benchmarks.fixtures import load_pages
+from compact import memory_budget
+from fighter import FighterData
+
+SIZES = [5, 20, 60]
+
+
+def retained_bytes(bouts: int) -> int:
+    """Gets the bytes still allocated for a compact fighter after its pages are dropped"""
+    stats_page, history_page = load_pages(bouts)
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    fighter = FighterData()
+    fighter.set_url_from_id(bouts)
+    fighter.stats_resource = bytes(stats_page)
+    fighter.history_resource = bytes(history_page)
+    fighter.set_soup()
+    compact = fighter.compact()
+    del fighter
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert compact.get_name()
+    return current - baseline
+
+
+def main() -> int:
+    """Checks every fixture size against the budget and prints the results"""
+    failures = 0
+    retained_bytes(SIZES[0])  # Warm up module level caches so they are not counted
+    for bouts in SIZES:
+        retained = retained_bytes(bouts)
+        budget = memory_budget(bouts)
+        status = 'ok' if retained <= budget else 'OVER BUDGET'
+        failures += retained > budget
+        print(f"{bouts:3d} bouts: {retained:8d} bytes retained, budget {budget:8d}  {status}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
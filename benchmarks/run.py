@@ -0,0 +1,182 @@
+"""
+    Benchmark Runner Module
+
+    This module times the parsing and extraction steps of FighterData on fixture pages,
+    records their peak memory, and measures end-to-end throughput against a local stand-in
+    server. Results are written as JSON so runs can be compared with --compare.
+
+    Usage: python -m benchmarks.run [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+from batch import FighterBatch
+from benchmarks.fixtures import load_pages
+from benchmarks.server import StandInServer
+from fetcher import PageFetcher
+from fighter import FighterData
+from ratelimit import AdaptiveRateLimiter
+import scraper
+
+SIZES = [5, 60]
+CONCURRENCY = [1, 8, 64]
+STAND_IN_FIRST_ID = 5000000
+EXTRACTORS = ['get_opponents', 'get_results', 'get_methods', 'get_round', 'get_time',
+              'get_event', 'get_record', 'get_name', 'get_striking', 'get_clinch',
+              'get_ground']
+
+
+def measure(run: Callable, setup: Callable = lambda: (), repeat: int = 20) -> Dict:
+    """
+        Times a function over several runs, calling setup before each one outside the timing,
+        then records the peak memory allocated by one more run.
+    """
+    timings = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        run(*args)
+        timings.append(time.perf_counter() - start)
+    args = setup()
+    tracemalloc.start()
+    run(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'repeat': repeat,
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'mean_s': statistics.fmean(timings),
+        'peak_bytes': peak,
+    }
+
+
+def loaded_fighter(size: int, parse: bool = True, parse_only: bool = False) -> FighterData:
+    """Gets a fighter holding the fixture pages of the given size"""
+    fighter = FighterData(parse_only=parse_only)
+    fighter.set_url_from_id(size)
+    fighter.stats_resource, fighter.history_resource = load_pages(size)
+    if parse:
+        fighter.set_soup()
+    return fighter
+
+
+def fresh_extractor(fighter: FighterData, name: str) -> Callable:
+    """Gets a setup function that clears the fighter's memoized extractions before a run"""
+    def setup():
+        fighter.fight_history = None
+        fighter.stat_tables = None
+        return (getattr(fighter, name),)
+    return setup
+
+
+def micro_benchmarks(repeat: int) -> Dict[str, Dict]:
+    """Benchmarks parsing and every extractor on each fixture size"""
+    results = {}
+    for size in SIZES:
+        for parse_only in (False, True):
+            label = 'set_soup[parse_only]' if parse_only else 'set_soup'
+            results[f"{label}/{size}"] = measure(
+                FighterData.set_soup,
+                lambda: (loaded_fighter(size, parse=False, parse_only=parse_only),),
+                repeat)
+        fighter = loaded_fighter(size)
+        for name in EXTRACTORS:
+            results[f"{name}/{size}"] = measure(
+                lambda getter: getter(), fresh_extractor(fighter, name), repeat)
+        stats = fighter.get_striking()[1]
+        results[f"find_column_avg/{size}"] = measure(
+            fighter.find_column_avg, lambda: (stats,), repeat)
+        other = loaded_fighter(size + 1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[f"compare_fighters/{size}"] = measure(
+                scraper.compare_fighters, lambda: (fighter, other), repeat)
+    return results
+
+
+def throughput_benchmarks(latency: float, bouts: int, per_worker: int) -> Dict[str, Dict]:
+    """Loads and extracts fighters from the stand-in server at each concurrency level"""
+    results = {}
+    for workers in CONCURRENCY:
+        with StandInServer(latency=latency, bouts=bouts) as server:
+            limiter = AdaptiveRateLimiter(initial_rate=1e6, max_rate=1e6, burst=1e6)
+            fetcher = PageFetcher(pool_size=workers, limiter=limiter, origin=server.origin)
+            batch = FighterBatch(max_workers=workers, fetcher=fetcher)
+            count = max(16, workers * per_worker)
+            start = time.perf_counter()
+            for fighter in batch.load(range(STAND_IN_FIRST_ID, STAND_IN_FIRST_ID + count)):
+                fighter.get_name()
+                fighter.get_striking()
+            elapsed = time.perf_counter() - start
+            fetcher.close()
+            results[f"throughput/{workers}"] = {
+                'fighters': count,
+                'requests': server.requests,
+                'errors': len(batch.errors),
+                'elapsed_s': elapsed,
+                'fighters_per_s': count / elapsed,
+            }
+    return results
+
+
+def compare(current: Dict, baseline: Dict) -> List[str]:
+    """Describes how each benchmark changed relative to a baseline run"""
+    lines = []
+    for name, result in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        key = 'fighters_per_s' if 'fighters_per_s' in result else 'median_s'
+        ratio = result[key] / previous[key] if previous[key] else float('nan')
+        lines.append(f"{name:32} {key:15} {previous[key]:12.6f} -> {result[key]:12.6f}"
+                     f"  ({ratio:.2f}x)")
+    return lines
+
+
+def main(argv=None) -> None:
+    """Runs the benchmarks and writes the results as JSON"""
+    parser = argparse.ArgumentParser(description="Benchmark the MMA data scraper offline.")
+    parser.add_argument('--output', help="file to write the JSON results to, else stdout")
+    parser.add_argument('--compare', help="previous JSON results to compare against")
+    parser.add_argument('--repeat', type=int, default=20, help="runs per micro benchmark")
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help="seconds the stand-in server delays each response")
+    parser.add_argument('--bouts', type=int, default=20,
+                        help="bouts on each page served by the stand-in server")
+    parser.add_argument('--per-worker', type=int, default=4,
+                        help="fighters loaded per worker in the throughput benchmarks")
+    parser.add_argument('--skip-throughput', action='store_true',
+                        help="only run the micro benchmarks")
+    args = parser.parse_args(argv)
+
+    results = micro_benchmarks(args.repeat)
+    if not args.skip_throughput:
+        results.update(throughput_benchmarks(args.latency, args.bouts, args.per_worker))
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        print('\n'.join(compare(report, baseline)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+    Stand-In Server Module
+
+    This module serves fixture fighter pages over local HTTP with a configurable latency,
+    so end-to-end throughput can be measured without touching ESPN.
+"""
+
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from benchmarks.fixtures import history_page, stats_page
+
+PAGE_PATTERN = re.compile(r'/mma/fighter/(stats|history)/_/id/(\d+)')
+
+
+class StandInServer:
+    """
+        A local HTTP server answering ESPN fighter page URLs with stand-in pages.
+
+        Attributes:
+            latency (float): The seconds each response is delayed by.
+            bouts (int): The number of bouts on every served page.
+            requests (int): The number of requests served so far.
+            origin (str): The scheme and host to point a PageFetcher at.
+    """
+
+    def __init__(self, latency: float = 0.05, bouts: int = 20) -> None:
+        """Initializes the server, which is not listening until started"""
+        self.latency = latency
+        self.bouts = bouts
+        self.requests = 0
+        self.origin: Optional[str] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def _page(self, page: str, fighter_id: int) -> bytes:
+        """Renders a page once and serves it from memory afterwards"""
+        key = (page, fighter_id)
+        if key not in self._pages:
+            render = stats_page if page == 'stats' else history_page
+            self._pages[key] = render(fighter_id, self.bouts).encode('utf-8')
+        return self._pages[key]
+
+    def _handler(self):
+        """Builds the request handler class bound to this server"""
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Answers fighter page requests after the configured latency"""
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """Serves a stats or history page, or 404 for any other path"""
+                with stand_in._lock:
+                    stand_in.requests += 1
+                time.sleep(stand_in.latency)
+                match = PAGE_PATTERN.search(self.path)
+                if match is None:
+                    self.send_error(404)
+                    return
+                body = stand_in._page(match.group(1), int(match.group(2)))
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                """Keeps the benchmark output quiet"""
+
+        return Handler
+
+    def start(self) -> 'StandInServer':
+        """Starts listening on a free local port in a background thread"""
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self.origin = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the server"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'StandInServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,97 @@
+"""
+    Startup Benchmark Module
+
+    This module times how long the scraper takes to start in each mode, in fresh
+    interpreters, and lists which heavy libraries each mode imported. No mode touches the
+    network: the interactive run is given an invalid fighter id and the headless run an
+    empty id list, so both exit right after starting up.
+
+    Usage: python -m benchmarks.startup [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+from benchmarks.run import compare
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['bs4', 'numpy', 'pandas', 'requests', 'sqlite3', 'tabulate']
+MODES = {
+    'python': (None, ''),  # Only starts the interpreter, as a floor for the other modes
+    'help': (['--help'], ''),
+    'interactive': ([], 'not-a-fighter\n'),
+    'headless': (['--ids', '-'], ''),
+}
+# Runs scraper.py as __main__ and reports the heavy modules it imported on stderr
+RUNNER = """
+import runpy, sys, json
+argv = json.loads(sys.argv[1])
+try:
+    if argv is not None:
+        sys.argv = ['scraper.py'] + argv
+        runpy.run_path('scraper.py', run_name='__main__')
+except SystemExit:
+    pass
+finally:
+    print(json.dumps([name for name in {modules} if name in sys.modules]), file=sys.stderr)
+"""
+
+
+def time_mode(argv: Optional[List[str]], stdin: str, repeat: int) -> Dict:
+    """Starts the scraper in a fresh interpreter several times and times each start"""
+    runner = RUNNER.format(modules=HEAVY_MODULES)
+    timings = []
+    imported: List[str] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, '-c', runner, json.dumps(argv)],
+                                 input=stdin, cwd=ROOT, capture_output=True,
+                                 text=True, check=False)
+        timings.append(time.perf_counter() - start)
+        imported = json.loads(process.stderr.strip().splitlines()[-1])
+    return {
+        'repeat': repeat,
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'mean_s': statistics.fmean(timings),
+        'imported': imported,
+    }
+
+
+def main(argv=None) -> None:
+    """Runs the startup benchmarks and writes the results as JSON"""
+    parser = argparse.ArgumentParser(description="Benchmark the scraper's startup time.")
+    parser.add_argument('--output', help="file to write the JSON results to, else stdout")
+    parser.add_argument('--compare', help="previous JSON results to compare against")
+    parser.add_argument('--repeat', type=int, default=10, help="starts per mode")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for mode, (mode_argv, stdin) in MODES.items():
+        results[f"startup/{mode}"] = time_mode(mode_argv, stdin, args.repeat)
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        print('\n'.join(compare(report, baseline)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
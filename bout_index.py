@@ -0,0 +1,194 @@
+"""
+    Bout Index Module
+
+    This module links the bouts of many scraped fighters together.
+    Every bout is listed on both fighters' history pages, so the two sides are merged by
+    (event, the two fighter ids) into one Bout, and inverted indexes by fighter, event,
+    method and result let queries touch only the bouts they return.
+"""
+
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from history import FightHistory
+
+OPPOSITE_RESULTS = {'W': 'L', 'L': 'W', 'D': 'D', 'NC': 'NC'}
+OUTCOMES = {'W': 'win', 'L': 'win', 'D': 'draw', 'NC': 'no contest'}
+METHOD_CATEGORIES = [('submission', 'submission'), ('ko', 'ko/tko'), ('tko', 'ko/tko'),
+                     ('decision', 'decision'), ('dq', 'disqualification'),
+                     ('disqualification', 'disqualification')]
+
+
+def method_category(method: str) -> str:
+    """Gets the broad category of a method, such as 'submission' for 'Submission (Guillotine)'"""
+    lowered = method.strip().lower()
+    for prefix, category in METHOD_CATEGORIES:
+        if lowered.startswith(prefix):
+            return category
+    return 'other'
+
+
+class Bout:
+    """
+        One fight between two fighters, merged from both of their history pages.
+
+        Attributes:
+            bout_id (int): The position of the bout in the index.
+            event (str): The event the bout took place at.
+            date (str): The date of the bout.
+            fighter_ids (frozenset): The ESPN ids of both fighters, None if one has no link.
+            names (dict): The name of each fighter id that is known.
+            results (dict): The result of each fighter id, either a W, L, D or NC.
+            method (str): The method the bout ended by.
+            end_round (str): The round the bout ended in.
+            end_time (str): The time in the round the bout ended at.
+            sides (set): The fighter ids whose history page listed the bout.
+    """
+
+    __slots__ = ('bout_id', 'event', 'date', 'fighter_ids', 'names', 'results', 'method',
+                 'end_round', 'end_time', 'sides')
+
+    def __init__(self, bout_id: int, event: str, date: str,
+                 fighter_ids: FrozenSet[Optional[str]], method: str, end_round: str,
+                 end_time: str) -> None:
+        """Initializes a bout with no sides reported yet"""
+        self.bout_id = bout_id
+        self.event = event
+        self.date = date
+        self.fighter_ids = fighter_ids
+        self.names: Dict[str, str] = {}
+        self.results: Dict[str, str] = {}
+        self.method = method
+        self.end_round = end_round
+        self.end_time = end_time
+        self.sides: Set[str] = set()
+
+    @property
+    def outcome(self) -> str:
+        """Gets whether the bout was a 'win', 'draw' or 'no contest', or '' if unknown"""
+        for result in self.results.values():
+            if result in OUTCOMES:
+                return OUTCOMES[result]
+        return ''
+
+    @property
+    def winner_id(self) -> Optional[str]:
+        """Gets the id of the fighter who won, if the bout had a winner"""
+        for fighter_id, result in self.results.items():
+            if result == 'W':
+                return fighter_id
+        return None
+
+    def to_dict(self) -> Dict:
+        """Gets the bout as a plain dictionary"""
+        return {
+            'event': self.event,
+            'date': self.date,
+            'fighter_ids': sorted(self.fighter_ids, key=lambda fighter_id: fighter_id or ''),
+            'names': dict(self.names),
+            'results': dict(self.results),
+            'method': self.method,
+            'round': self.end_round,
+            'time': self.end_time,
+        }
+
+
+class BoutIndex:
+    """
+        Every bout of the added fighters, deduplicated, with inverted indexes.
+
+        Attributes:
+            bouts (list): Each Bout, indexed by its bout_id.
+            fighters (set): The ids of the fighters whose histories were added.
+            by_fighter (dict): The bout ids of each fighter id.
+            by_event (dict): The bout ids of each event.
+            by_method (dict): The bout ids of each method, such as 'Decision - Split'.
+            by_category (dict): The bout ids of each method category, such as 'submission'.
+            by_outcome (dict): The bout ids of each outcome, 'win', 'draw' or 'no contest'.
+
+        Queries start from the smallest matching index entry, so their cost follows the
+        number of bouts returned rather than the number of fighters added.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty index"""
+        self.bouts: List[Bout] = []
+        self.fighters: Set[str] = set()
+        self.by_fighter: Dict[str, Set[int]] = defaultdict(set)
+        self.by_event: Dict[str, Set[int]] = defaultdict(set)
+        self.by_method: Dict[str, Set[int]] = defaultdict(set)
+        self.by_category: Dict[str, Set[int]] = defaultdict(set)
+        self.by_outcome: Dict[str, Set[int]] = defaultdict(set)
+        self._keys: Dict[Tuple[str, FrozenSet[Optional[str]], str], int] = {}
+
+    def __len__(self) -> int:
+        """Gets the number of distinct bouts"""
+        return len(self.bouts)
+
+    def add(self, fighter) -> None:
+        """Adds the fight history of a FighterData or CompactFighter"""
+        self.add_history(fighter.fighter_id, fighter.get_name(), fighter.get_fight_history())
+
+    def add_history(self, fighter_id: str, name: str, history: FightHistory) -> None:
+        """Adds one fighter's fight history, merging bouts already listed by an opponent"""
+        if fighter_id in self.fighters:
+            return
+        self.fighters.add(fighter_id)
+        for date, opponent, opponent_id, result, method, end_round, end_time, event in zip(
+                history.dates, history.opponents, history.opponent_ids, history.results,
+                history.methods, history.rounds, history.times, history.events):
+            # An opponent without a link can only be told apart by name
+            key = (event, frozenset((fighter_id, opponent_id)),
+                   opponent if opponent_id is None else '')
+            bout = self._bout(key, date, method, end_round, end_time)
+            bout.sides.add(fighter_id)
+            bout.names[fighter_id] = name
+            bout.results[fighter_id] = result
+            if opponent_id is not None:
+                bout.names.setdefault(opponent_id, opponent)
+                if opponent_id not in bout.sides and result in OPPOSITE_RESULTS:
+                    bout.results[opponent_id] = OPPOSITE_RESULTS[result]
+            if bout.outcome:
+                self.by_outcome[bout.outcome].add(bout.bout_id)
+
+    def _bout(self, key: Tuple[str, FrozenSet[Optional[str]], str], date: str,
+              method: str, end_round: str, end_time: str) -> Bout:
+        """Gets the bout with this key, creating and indexing it the first time it is seen"""
+        event, fighter_ids, _ = key
+        if key in self._keys:
+            return self.bouts[self._keys[key]]
+        bout = Bout(len(self.bouts), event, date, fighter_ids, method, end_round, end_time)
+        self._keys[key] = bout.bout_id
+        self.bouts.append(bout)
+        for fighter_id in fighter_ids:
+            if fighter_id is not None:
+                self.by_fighter[fighter_id].add(bout.bout_id)
+        self.by_event[event].add(bout.bout_id)
+        self.by_method[method].add(bout.bout_id)
+        self.by_category[method_category(method)].add(bout.bout_id)
+        return bout
+
+    def find(self, fighter_id: Optional[str] = None, event: Optional[str] = None,
+             method: Optional[str] = None, category: Optional[str] = None,
+             outcome: Optional[str] = None) -> List[Bout]:
+        """
+            Gets the bouts matching every given filter, in the order they were indexed.
+            For example find(event='UFC 280', category='submission').
+        """
+        filters = [(self.by_fighter, fighter_id), (self.by_event, event),
+                   (self.by_method, method), (self.by_category, category),
+                   (self.by_outcome, outcome)]
+        matches = [index.get(value, set()) for index, value in filters if value is not None]
+        if not matches:
+            return list(self.bouts)
+        matches.sort(key=len)
+        bout_ids = [bout_id for bout_id in matches[0]
+                    if all(bout_id in others for others in matches[1:])]
+        return [self.bouts[bout_id] for bout_id in sorted(bout_ids)]
+
+    def events(self) -> List[str]:
+        """Gets every event with at least one indexed bout"""
+        return list(self.by_event)
+
+    def card(self, event: str) -> List[Bout]:
+        """Gets every bout at an event"""
+        return self.find(event=event)
@@ -0,0 +1,157 @@
+"""
+    Cache Module
+
+    This module stores downloaded pages on disk keyed by URL.
+    Entries expire after a TTL, are revalidated with ETag/Last-Modified and are evicted
+    least-recently-used first once the cache grows past its size cap.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser('~'), '.cache', 'mma-data-scraper')
+DEFAULT_TTL = 6 * 60 * 60
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class CacheEntry:
+    """
+        A cached page body along with the validators needed to revalidate it.
+
+        Attributes:
+            body (bytes): The cached page body.
+            etag (str): The ETag header the page was served with, if any.
+            last_modified (str): The Last-Modified header the page was served with, if any.
+            fetched_at (float): The time the page was last downloaded or revalidated.
+    """
+
+    __slots__ = ('body', 'etag', 'last_modified', 'fetched_at')
+
+    def __init__(self, body: bytes, etag: Optional[str],
+                 last_modified: Optional[str], fetched_at: float) -> None:
+        """Initializes a new cache entry"""
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def is_fresh(self, ttl: float) -> bool:
+        """Checks whether the entry is younger than the TTL"""
+        return time.time() - self.fetched_at < ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Gets the conditional request headers for revalidating the entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+        An on-disk, size-capped LRU cache of page bodies keyed by URL.
+
+        Attributes:
+            directory (str): The directory the cached pages are stored in.
+            ttl (float): The number of seconds an entry is served without revalidation.
+            max_bytes (int): The total size of page bodies kept before evicting.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """Initializes the cache, creating its directory if needed"""
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(os.path.getsize(os.path.join(directory, name))
+                         for name in os.listdir(directory) if name.endswith('.body'))
+
+    def _path(self, url: str) -> str:
+        """Gets the path, without extension, that a URL is stored under"""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Gets the cached entry of a URL, marking it as recently used"""
+        path = self._path(url)
+        try:
+            with open(f"{path}.meta", encoding='utf-8') as meta_file:
+                meta = json.load(meta_file)
+            with open(f"{path}.body", 'rb') as body_file:
+                body = body_file.read()
+            os.utime(f"{path}.body")
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(body, meta.get('etag'), meta.get('last_modified'),
+                          meta['fetched_at'])
+
+    def put(self, url: str, body: bytes, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """Stores the body of a URL and evicts old entries if the cache is full"""
+        path = self._path(url)
+        with self._lock:
+            try:
+                previous_size = os.path.getsize(f"{path}.body")
+            except OSError:
+                previous_size = 0
+            self._write(f"{path}.body", body)
+            self._write_meta(path, url, etag, last_modified)
+            self._size += len(body) - previous_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def revalidate(self, url: str, entry: CacheEntry) -> None:
+        """Marks an entry as fresh again after the server answered 304 Not Modified"""
+        entry.fetched_at = time.time()
+        with self._lock:
+            self._write_meta(self._path(url), url, entry.etag, entry.last_modified)
+
+    def clear(self) -> None:
+        """Removes every cached page"""
+        with self._lock:
+            for name in os.listdir(self.directory):
+                os.remove(os.path.join(self.directory, name))
+            self._size = 0
+
+    def _write_meta(self, path: str, url: str, etag: Optional[str],
+                    last_modified: Optional[str]) -> None:
+        """Writes the metadata file of an entry"""
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified,
+                'fetched_at': time.time()}
+        self._write(f"{path}.meta", json.dumps(meta).encode('utf-8'))
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        """Writes a file atomically so readers never see a partial entry"""
+        # Unique per process and thread, as processes can share the cache directory
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, path)
+
+    def _evict(self) -> None:
+        """Removes least recently used entries until the cache is under its size cap"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.body'):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name[:-len('.body')]))
+        entries.sort()
+        for _, size, key in entries:
+            if self._size <= self.max_bytes:
+                break
+            for extension in ('.body', '.meta'):
+                try:
+                    os.remove(os.path.join(self.directory, key + extension))
+                except OSError:
+                    pass
+            self._size -= size
@@ -0,0 +1,200 @@
+"""
+    Compact Module
+
+    This module holds the memory-bounded form of a fighter.
+    Once a FighterData has been extracted it can collapse into a CompactFighter, which keeps
+    the fight history columns and the stats tables as float arrays and drops the downloaded
+    pages and parse trees.
+
+    Memory budget: a CompactFighter takes at most 4 KiB plus 1.5 KiB per bout, measured
+    with tracemalloc by `python -m benchmarks.memory`.
+"""
+
+import math
+import sys
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from history import FightHistory
+from stat_matrix import StatMatrix
+
+BASE_BUDGET_BYTES = 4 * 1024
+BOUT_BUDGET_BYTES = 1536
+
+
+def memory_budget(bouts: int) -> int:
+    """Gets the documented number of bytes a compact fighter with this many bouts may use"""
+    return BASE_BUDGET_BYTES + BOUT_BUDGET_BYTES * bouts
+
+
+def _number_text(value: float) -> str:
+    """Formats a parsed number without a trailing '.0' for whole numbers"""
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _format_cell(landed: float, attempted: float, percent: bool) -> str:
+    """Formats a parsed stat cell back into the text ESPN shows"""
+    if math.isnan(landed):
+        return '-'
+    if not math.isnan(attempted):
+        return f"{_number_text(landed)}/{_number_text(attempted)}"
+    if percent:
+        return f"{_number_text(landed)}%"
+    return _number_text(landed)
+
+
+class CompactTable:
+    """
+        A stats table stored as float arrays.
+
+        Attributes:
+            matrix (StatMatrix): The parsed table.
+            percent (numpy.ndarray): Whether each column was shown as a percentage.
+            bouts (list): The index in the fight history of the bout of each row, or None.
+            exact_rows (dict): The interned text of each row that formatting its parsed values
+                does not give back, such as a row with '0.0', '1.50' or missing cells.
+
+        Almost every row formats back to its text, so only the few that do not are stored
+        and rows() returns exactly the extracted strings.
+    """
+
+    __slots__ = ('matrix', 'percent', 'bouts', 'exact_rows')
+
+    def __init__(self, headings: List[str], stats: List[List[str]],
+                 bouts: Optional[List[Optional[int]]] = None) -> None:
+        """Parses a table of stat strings"""
+        self.bouts = bouts if bouts is not None else [None] * len(stats)
+        self.matrix = StatMatrix.from_table(
+            [sys.intern(heading) for heading in headings], stats)
+        self.percent = np.array([any(row[column].endswith('%') for row in stats
+                                     if column < len(row))
+                                 for column in range(len(headings))], dtype=bool)
+        self.exact_rows: Dict[int, Tuple[str, ...]] = {
+            index: tuple(sys.intern(cell) for cell in row)
+            for index, (row, formatted) in enumerate(zip(stats, self._formatted_rows()))
+            if row != formatted}
+
+    def _formatted_rows(self) -> List[List[str]]:
+        """Formats the parsed values of each row back into text"""
+        return [[_format_cell(landed, attempted, percent)
+                 for landed, attempted, percent in zip(landed_row, attempted_row,
+                                                       self.percent)]
+                for landed_row, attempted_row in zip(self.matrix.landed.tolist(),
+                                                     self.matrix.attempted.tolist())]
+
+    def rows(self) -> List[List[str]]:
+        """Rebuilds the stat strings of the table, exactly as they were extracted"""
+        rows = self._formatted_rows()
+        for index, row in self.exact_rows.items():
+            rows[index] = list(row)
+        return rows
+
+
+class CompactFighter:
+    """
+        A memory-bounded fighter record holding only extracted data.
+
+        Attributes:
+            fighter_id (str): The ESPN id of the fighter.
+            name (str): The name of the fighter.
+            record (tuple): The fighter's record, TKO/KO and submission counts.
+            fight_history (FightHistory): The fight history with interned strings.
+            tables (dict): The CompactTable of each stat type found on the stats page.
+
+        The getters match FighterData so either can be passed to the same code.
+    """
+
+    __slots__ = ('fighter_id', 'name', 'record', 'fight_history', 'tables')
+
+    def __init__(self, fighter_id: Optional[str], name: str, record: List[str],
+                 fight_history: FightHistory,
+                 tables: Dict[str, CompactTable]) -> None:
+        """Initializes a compact fighter from extracted data"""
+        self.fighter_id = fighter_id
+        self.name = name
+        self.record = tuple(record)
+        self.fight_history = fight_history
+        self.tables = tables
+
+    @staticmethod
+    def intern_history(history: FightHistory) -> FightHistory:
+        """Interns the strings of a fight history, which repeat heavily across fighters"""
+        for column in FightHistory.__slots__:
+            setattr(history, column, [None if value is None else sys.intern(value)
+                                      for value in getattr(history, column)])
+        return history
+
+    def get_fight_history(self) -> FightHistory:
+        """Gets the fight history"""
+        return self.fight_history
+
+    def get_opponents(self) -> List[str]:
+        """Gets the opponents which the fighter has fought"""
+        return self.fight_history.opponents
+
+    def get_opponent_ids(self) -> List[Optional[str]]:
+        """Gets the ESPN ids of the opponents which the fighter has fought"""
+        return self.fight_history.opponent_ids
+
+    def get_results(self) -> List[str]:
+        """Gets the result of the fight, either a W, L, D or NC"""
+        return self.fight_history.results
+
+    def get_methods(self) -> List[str]:
+        """Gets the method how the fight ended"""
+        return self.fight_history.methods
+
+    def get_round(self) -> List[str]:
+        """Gets the round which the fight ended"""
+        return self.fight_history.rounds
+
+    def get_time(self) -> List[str]:
+        """Gets the time in the round which it ended"""
+        return self.fight_history.times
+
+    def get_event(self) -> List[str]:
+        """Gets the event that a fighter fought at"""
+        return self.fight_history.events
+
+    def get_record(self) -> List[str]:
+        """Gets a fighter's record in the formal W-L-D"""
+        return list(self.record)
+
+    def get_name(self) -> str:
+        """Gets the name of the fighter"""
+        return self.name
+
+    def _table(self, stat_type: str) -> CompactTable:
+        """Gets a stats table, raising IndexError like FighterData if the page had none"""
+        if stat_type not in self.tables:
+            raise IndexError(f"No {stat_type} table for fighter {self.fighter_id}")
+        return self.tables[stat_type]
+
+    def get_stat_matrix(self, stat_type: str) -> StatMatrix:
+        """Gets the 'striking', 'clinch' or 'ground' statistics as a typed StatMatrix"""
+        return self._table(stat_type).matrix
+
+    def get_stat_bouts(self, stat_type: str) -> List[Optional[int]]:
+        """Gets the index in the fight history of the bout of each row of a stats table"""
+        return self._table(stat_type).bouts
+
+    def get_striking(self) -> Tuple[List[str], List[List[str]]]:
+        """Gets the striking statistics of a fighter"""
+        table = self._table('striking')
+        return list(table.matrix.headings), table.rows()
+
+    def get_clinch(self) -> Tuple[List[str], List[List[str]]]:
+        """Gets the clinch statistics of a fighter"""
+        table = self._table('clinch')
+        return list(table.matrix.headings), table.rows()
+
+    def get_ground(self) -> Tuple[List[str], List[List[str]]]:
+        """Gets the ground statistics of a fighter"""
+        table = self._table('ground')
+        return list(table.matrix.headings), table.rows()
+
+    def find_column_avg(self, stats: List[List[str]]) -> List[float]:
+        """Finds the average of a column in the statistics table"""
+        if not stats:
+            return []
+        matrix = StatMatrix.from_table([''] * max(len(row) for row in stats), stats)
+        return matrix.mean().tolist()
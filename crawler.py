@@ -0,0 +1,125 @@
+"""
+    Crawler Module
+
+    This module discovers fighters by walking the opponent links of their fight histories.
+    The walk is breadth-first from one or more seed ids and checkpoints its frontier and
+    visited set so a long crawl can be stopped and resumed without re-fetching fighters.
+"""
+
+import json
+import os
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, Optional, Set, Tuple
+from batch import FighterBatch
+from fighter import FighterData
+
+
+class OpponentCrawler:
+    """
+        A resumable breadth-first crawl over the opponent graph.
+
+        Attributes:
+            max_depth (int): How many opponent hops away from a seed fighters are crawled.
+            max_fighters (int): The number of fighters to crawl before stopping, if any.
+            checkpoint_path (str): The JSON file the crawl state is saved to, if any.
+            checkpoint_every (int): How many fighters are crawled between checkpoints.
+            batch (FighterBatch): The batch used to fetch fighters concurrently.
+            frontier (deque): The (fighter id, depth) pairs still to crawl, in order.
+            visited (set): The ids of the fighters already crawled.
+            failed (dict): The error message of each fighter id that failed to load.
+    """
+
+    def __init__(self, seeds: Iterable = (), max_depth: int = 1,
+                 max_fighters: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None, checkpoint_every: int = 100,
+                 batch: Optional[FighterBatch] = None) -> None:
+        """Initializes a crawl from the seed fighter ids"""
+        self.max_depth = max_depth
+        self.max_fighters = max_fighters
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.batch = batch or FighterBatch(pages=('history',), parse_only=True)
+        self.frontier: Deque[Tuple[str, int]] = deque()
+        self.visited: Set[str] = set()
+        self.failed: Dict[str, str] = {}
+        self._queued: Set[str] = set()
+        for seed in seeds:
+            self._enqueue(str(seed), 0)
+
+    @classmethod
+    def resume(cls, checkpoint_path: str, **kwargs) -> 'OpponentCrawler':
+        """Restores a crawl from its checkpoint file"""
+        with open(checkpoint_path, encoding='utf-8') as checkpoint_file:
+            state = json.load(checkpoint_file)
+        kwargs.setdefault('max_depth', state['max_depth'])
+        kwargs.setdefault('max_fighters', state['max_fighters'])
+        crawler = cls(checkpoint_path=checkpoint_path, **kwargs)
+        crawler.visited = set(state['visited'])
+        crawler.failed = state['failed']
+        crawler._queued = crawler.visited | set(crawler.failed)
+        for fighter_id, depth in state['frontier']:
+            crawler._enqueue(fighter_id, depth)
+        return crawler
+
+    def _enqueue(self, fighter_id: str, depth: int) -> None:
+        """Adds a fighter to the frontier unless it has already been queued"""
+        if fighter_id not in self._queued and depth <= self.max_depth:
+            self._queued.add(fighter_id)
+            self.frontier.append((fighter_id, depth))
+
+    def _limit_reached(self) -> bool:
+        """Checks whether the crawl has visited its maximum number of fighters"""
+        return self.max_fighters is not None and len(self.visited) >= self.max_fighters
+
+    def save_checkpoint(self) -> None:
+        """Atomically writes the frontier, visited set and failures to the checkpoint file"""
+        if self.checkpoint_path is None:
+            return
+        state = {
+            'max_depth': self.max_depth,
+            'max_fighters': self.max_fighters,
+            'frontier': list(self.frontier),
+            'visited': sorted(self.visited),
+            'failed': self.failed,
+        }
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(state, checkpoint_file)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def crawl(self) -> Iterator[FighterData]:
+        """
+            Crawls the frontier in waves, yielding each fighter once its history has loaded.
+            The opponents of every fighter are queued one level deeper than the fighter.
+            If the caller stops early, unfinished fighters go back to the front of the frontier.
+        """
+        wave_size = self.batch.max_workers * 4
+        since_checkpoint = 0
+        wave: Dict[str, int] = {}
+        try:
+            while self.frontier and not self._limit_reached():
+                budget = wave_size
+                if self.max_fighters is not None:
+                    budget = min(budget, self.max_fighters - len(self.visited))
+                while self.frontier and len(wave) < budget:
+                    fighter_id, depth = self.frontier.popleft()
+                    wave[fighter_id] = depth
+                for fighter in self.batch.load(list(wave)):
+                    depth = wave.pop(fighter.fighter_id)
+                    self.visited.add(fighter.fighter_id)
+                    since_checkpoint += 1
+                    for opponent_id in fighter.get_opponent_ids():
+                        if opponent_id is not None:
+                            self._enqueue(opponent_id, depth + 1)
+                    yield fighter
+                # Fighters left in the wave failed to load, their errors stay in batch.errors
+                # so the caller reports them
+                for fighter_id in wave:
+                    self.failed[fighter_id] = str(self.batch.errors.get(fighter_id))
+                wave.clear()
+                if since_checkpoint >= self.checkpoint_every:
+                    self.save_checkpoint()
+                    since_checkpoint = 0
+        finally:
+            self.frontier.extendleft(reversed(list(wave.items())))
+            self.save_checkpoint()
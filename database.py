@@ -0,0 +1,230 @@
+"""
+    Database Module
+
+    This module keeps scraped fighters in a local SQLite database.
+    Fighters, their bouts and their per-fight stat rows are stored so later runs can
+    refresh only the fighters whose record has changed since the last sync.
+"""
+
+import math
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+from batch import FighterBatch
+from fighter import FighterData
+from history import FightHistory
+from stat_tables import STAT_TYPES
+
+DEFAULT_DATABASE_PATH = os.path.join(
+    os.path.expanduser('~'), '.local', 'share', 'mma-data-scraper', 'fighters.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fighters (
+    fighter_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    record TEXT,
+    ko_tko TEXT,
+    submissions TEXT,
+    bout_count INTEGER NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bouts (
+    fighter_id TEXT NOT NULL REFERENCES fighters (fighter_id) ON DELETE CASCADE,
+    bout_index INTEGER NOT NULL,
+    date TEXT,
+    opponent TEXT,
+    opponent_id TEXT,
+    result TEXT,
+    method TEXT,
+    end_round TEXT,
+    end_time TEXT,
+    event TEXT,
+    PRIMARY KEY (fighter_id, bout_index)
+);
+CREATE TABLE IF NOT EXISTS stat_rows (
+    fighter_id TEXT NOT NULL REFERENCES fighters (fighter_id) ON DELETE CASCADE,
+    stat_type TEXT NOT NULL,
+    row_index INTEGER NOT NULL,
+    bout_index INTEGER,
+    heading TEXT NOT NULL,
+    value TEXT,
+    landed REAL,
+    attempted REAL,
+    PRIMARY KEY (fighter_id, stat_type, row_index, heading)
+);
+CREATE INDEX IF NOT EXISTS bouts_opponent_id ON bouts (opponent_id);
+"""
+
+
+def _number(value: float) -> Optional[float]:
+    """Converts a NaN from a stat matrix into a NULL"""
+    return None if math.isnan(value) else value
+
+
+class FighterDatabase:
+    """
+        A local SQLite store of fighters, bouts and per-fight stat rows.
+
+        Attributes:
+            path (str): The path of the SQLite database file.
+            connection (sqlite3.Connection): The open connection to the database.
+
+        Bouts and stat rows are stored in the order ESPN lists them, most recent fight first.
+    """
+
+    def __init__(self, path: str = DEFAULT_DATABASE_PATH) -> None:
+        """Opens the database, creating it and its schema if needed"""
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.executescript(SCHEMA)
+        columns = [row[1] for row in self.connection.execute('PRAGMA table_info(stat_rows)')]
+        if 'bout_index' not in columns:  # Databases created before stat rows joined to bouts
+            self.connection.execute('ALTER TABLE stat_rows ADD COLUMN bout_index INTEGER')
+
+    def close(self) -> None:
+        """Closes the connection to the database"""
+        self.connection.close()
+
+    def fighter_ids(self) -> List[str]:
+        """Gets the id of every stored fighter"""
+        rows = self.connection.execute('SELECT fighter_id FROM fighters ORDER BY fighter_id')
+        return [row[0] for row in rows]
+
+    def get_sync_state(self, fighter_id: str) -> Optional[Tuple[List[str], int]]:
+        """Gets the record and bout count a fighter had when it was last synced"""
+        row = self.connection.execute(
+            'SELECT record, ko_tko, submissions, bout_count FROM fighters '
+            'WHERE fighter_id = ?', (fighter_id,)).fetchone()
+        if row is None:
+            return None
+        record = [value for value in row[:3] if value is not None]
+        return record, row[3]
+
+    def needs_refresh(self, fighter: FighterData) -> bool:
+        """Checks whether a fighter's record or bout count differs from the stored one"""
+        state = self.get_sync_state(fighter.fighter_id)
+        if state is None:
+            return True
+        record, bout_count = state
+        return record != fighter.get_record() or bout_count != len(fighter.get_results())
+
+    def save(self, fighter: FighterData, include_stats: bool = True) -> None:
+        """
+            Stores a fighter, replacing its previously stored bouts and, unless
+            include_stats is False, its stat rows. Without stats the stored rows are kept
+            and pointed at the new indexes of their bouts.
+        """
+        history = fighter.get_fight_history()
+        record = fighter.get_record() + [None] * 3
+        stat_rows = self._stat_rows(fighter) if include_stats else []
+        with self.connection:
+            self.connection.execute(
+                'INSERT INTO fighters VALUES (?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (fighter_id) DO UPDATE SET name = excluded.name, '
+                'record = excluded.record, ko_tko = excluded.ko_tko, '
+                'submissions = excluded.submissions, bout_count = excluded.bout_count, '
+                'synced_at = excluded.synced_at',
+                (fighter.fighter_id, fighter.get_name(), record[0], record[1], record[2],
+                 len(history), time.time()))
+            if not include_stats:
+                self._move_stat_bouts(fighter.fighter_id, history)
+            self.connection.execute(
+                'DELETE FROM bouts WHERE fighter_id = ?', (fighter.fighter_id,))
+            self.connection.executemany(
+                'INSERT INTO bouts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                zip([fighter.fighter_id] * len(history), range(len(history)),
+                    history.dates, history.opponents, history.opponent_ids,
+                    history.results, history.methods, history.rounds, history.times,
+                    history.events))
+            if include_stats:
+                self.connection.execute(
+                    'DELETE FROM stat_rows WHERE fighter_id = ?', (fighter.fighter_id,))
+                self.connection.executemany(
+                    'INSERT INTO stat_rows (fighter_id, stat_type, row_index, bout_index, '
+                    'heading, value, landed, attempted) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    stat_rows)
+
+    def _move_stat_bouts(self, fighter_id: str, history: FightHistory) -> None:
+        """
+            Points a fighter's stored stat rows from its stored bouts to the same bouts in
+            its new history, matched by date and opponent. Bouts no longer listed get NULL.
+        """
+        new_indexes: Dict[Tuple[str, str], int] = {}
+        for index in range(len(history) - 1, -1, -1):  # The most recent match wins
+            opponent = history.opponent_ids[index] or history.opponents[index]
+            new_indexes[history.dates[index], opponent] = index
+        old_keys = {row[0]: (row[1], row[2]) for row in self.connection.execute(
+            'SELECT bout_index, date, COALESCE(opponent_id, opponent) FROM bouts '
+            'WHERE fighter_id = ?', (fighter_id,))}
+        rows = self.connection.execute(
+            'SELECT rowid, bout_index FROM stat_rows WHERE fighter_id = ? '
+            'AND bout_index IS NOT NULL', (fighter_id,)).fetchall()
+        self.connection.executemany(
+            'UPDATE stat_rows SET bout_index = ? WHERE rowid = ?',
+            ((new_indexes.get(old_keys.get(bout_index)), rowid) for rowid, bout_index in rows))
+
+    @staticmethod
+    def _stat_rows(fighter: FighterData) -> List[tuple]:
+        """Flattens a fighter's stats tables into one database row per cell"""
+        rows = []
+        for stat_type in STAT_TYPES:
+            try:
+                headings, stats = getattr(fighter, f'get_{stat_type}')()
+            except IndexError:
+                continue  # The page has no table of this type
+            matrix = fighter.get_stat_matrix(stat_type)
+            bouts = fighter.get_stat_bouts(stat_type)
+            for row_index, stat_row in enumerate(stats):
+                for column, heading in enumerate(headings):
+                    rows.append((
+                        fighter.fighter_id, stat_type, row_index, bouts[row_index], heading,
+                        stat_row[column],
+                        _number(float(matrix.landed[row_index, column])),
+                        _number(float(matrix.attempted[row_index, column]))))
+        return rows
+
+    def refresh(self, fighter_ids: Iterable,
+                batch: Optional[FighterBatch] = None) -> List[str]:
+        """
+            Syncs the given fighters, re-scraping only the ones that changed.
+
+            Only history pages are downloaded to compare each fighter's record and bout count
+            with the stored ones. Stats pages are then fetched for the changed fighters alone,
+            each as soon as its history shows a change, and every fighter's pages are dropped
+            once it is saved, so memory stays flat however many fighters change.
+            Returns the ids of the fighters that were updated, failures are left in batch.errors.
+        """
+        batch = batch or FighterBatch(pages=('history',), parse_only=True)
+        updated: List[str] = []
+        pending: Dict[Future, FighterData] = {}
+        max_pending = batch.max_workers * 2
+
+        def save_finished(futures: Iterable[Future]) -> None:
+            """Saves the fighters whose stats page has downloaded, then drops their pages"""
+            for future in futures:
+                fighter = pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    batch.errors[fighter.fighter_id] = error
+                else:
+                    self.save(fighter)
+                    updated.append(fighter.fighter_id)
+                fighter.release()
+
+        with ThreadPoolExecutor(max_workers=batch.max_workers) as executor:
+            for fighter in batch.load(fighter_ids):
+                if not self.needs_refresh(fighter):
+                    fighter.release()
+                    continue
+                pending[executor.submit(fighter.fetch_stats)] = fighter
+                save_finished([future for future in pending if future.done()])
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    save_finished(done)
+            save_finished(list(pending))
+        return updated
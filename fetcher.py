@@ -0,0 +1,167 @@
+"""
+    Fetcher Module
+
+    This module provides the HTTP layer used to download fighter pages.
+    A PageFetcher keeps one pooled keep-alive session that is shared by every fighter it loads,
+    and can serve pages from an on-disk ResponseCache before going to the network.
+    Requests are paced per host and retried with backoff, raising FetchError when they fail.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from cache import ResponseCache
+from instrumentation import METRICS, timed
+from ratelimit import (RETRY_STATUSES, AdaptiveRateLimiter, FetchError, RetryPolicy,
+                       parse_retry_after)
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0'
+}
+TIMEOUT = 10
+
+
+class PageFetcher:
+    """
+        Downloads pages over a shared, pooled requests session.
+
+        Attributes:
+            timeout (float): The timeout in seconds for each request.
+            session (requests.Session): The keep-alive session used for every request.
+            cache (ResponseCache): The on-disk cache consulted before the network, if any.
+            limiter (AdaptiveRateLimiter): The per-host pacing of requests, if any.
+            retry (RetryPolicy): How failed requests are retried.
+            origin (str): The scheme and host every request is sent to instead of the one in
+                its URL, such as a local stand-in server, if any.
+    """
+
+    def __init__(self, pool_size: int = 10, timeout: float = TIMEOUT,
+                 cache: Optional[ResponseCache] = None,
+                 limiter: Optional[AdaptiveRateLimiter] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 origin: Optional[str] = None) -> None:
+        """Initializes a new fetcher with a connection pool of the given size"""
+        self.origin = origin
+        self.timeout = timeout
+        self.cache = cache
+        self.limiter = limiter if limiter is not None else AdaptiveRateLimiter()
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+    @timed('http.fetch')
+    def fetch(self, url: str) -> bytes:
+        """
+            Gets the body of a page. Fresh cached pages are returned without a request,
+            stale ones are revalidated so an unchanged page only costs a 304.
+            Raises FetchError if the page cannot be downloaded.
+        """
+        if self.origin is not None:
+            url = self.origin + urlsplit(url)._replace(scheme='', netloc='').geturl()
+        if self.cache is None:
+            return self.request(url).content
+
+        entry = self.cache.get(url)
+        if entry is not None and entry.is_fresh(self.cache.ttl):
+            METRICS.count('cache.hit')
+            METRICS.count('cache.bytes', len(entry.body))
+            return entry.body
+        METRICS.count('cache.miss' if entry is None else 'cache.stale')
+        headers = entry.validators() if entry is not None else {}
+        response = self.request(url, headers)
+        if response.status_code == 304 and entry is not None:
+            METRICS.count('cache.revalidated')
+            self.cache.revalidate(url, entry)
+            return entry.body
+        if response.status_code == 200:
+            self.cache.put(url, response.content,
+                           etag=response.headers.get('ETag'),
+                           last_modified=response.headers.get('Last-Modified'))
+        return response.content
+
+    def request(self, url: str,
+                headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+            Sends a GET request, pacing it through the limiter and retrying connection
+            errors, 429 and 5xx responses with backoff. Returns a 200 or 304 response.
+        """
+        attempts = self.retry.max_attempts
+        for attempt in range(1, attempts + 1):
+            if attempt > 1:
+                METRICS.count('http.retries')
+            if self.limiter is not None:
+                with METRICS.timer('http.rate_limit_wait'):
+                    self.limiter.acquire(url)
+            try:
+                response = self._get(url, headers)
+            except requests.RequestException as error:
+                METRICS.count('http.connection_errors')
+                if attempt == attempts:
+                    raise FetchError(url, None, attempt, str(error)) from error
+                time.sleep(self.retry.delay(attempt))
+                continue
+            if response.status_code in (200, 304):
+                if self.limiter is not None:
+                    self.limiter.on_success(url)
+                return response
+            reason = f"HTTP {response.status_code} {response.reason}"
+            if response.status_code not in RETRY_STATUSES or attempt == attempts:
+                raise FetchError(url, response.status_code, attempt, reason)
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if response.status_code == 429 and self.limiter is not None:
+                METRICS.count('http.throttled')
+                self.limiter.on_throttle(url, retry_after)
+            time.sleep(self.retry.delay(attempt, retry_after))
+        raise FetchError(url, None, attempts, "no attempts were made")
+
+    def _get(self, url: str, headers: Optional[Dict[str, str]]) -> requests.Response:
+        """
+            Sends a single GET request. While metrics are enabled its time is split into
+            time to headers, which includes DNS, connect and TLS on a new connection, and
+            body download, and whether it opened a new connection is counted. Under
+            concurrency the new connection attribution is approximate.
+        """
+        if not METRICS.enabled:
+            return self.session.get(url, headers=headers, timeout=self.timeout)
+        connections = self._connection_count()
+        start = time.perf_counter()
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        total = time.perf_counter() - start
+        headers_time = response.elapsed.total_seconds()
+        new_connection = self._connection_count() > connections
+        METRICS.record('http.request', total)
+        METRICS.record('http.headers.new_connection' if new_connection
+                       else 'http.headers.reused_connection', headers_time)
+        METRICS.record('http.download', max(0.0, total - headers_time))
+        METRICS.count('http.new_connections' if new_connection else 'http.reused_connections')
+        METRICS.count(f'http.status.{response.status_code}')
+        METRICS.count('http.bytes', len(response.content))
+        return response
+
+    def _connection_count(self) -> int:
+        """Gets the number of connections the session's pools have opened so far"""
+        pools = self.adapter.poolmanager.pools
+        return sum(getattr(pools.get(key), 'num_connections', 0) for key in pools.keys())
+
+    def close(self) -> None:
+        """Closes the pooled connections of the session"""
+        self.session.close()
+
+
+_DEFAULT_FETCHER: Optional[PageFetcher] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_fetcher() -> PageFetcher:
+    """Gets the fetcher shared by fighters that were not given their own"""
+    global _DEFAULT_FETCHER  # pylint: disable=global-statement
+    with _DEFAULT_LOCK:
+        if _DEFAULT_FETCHER is None:
+            _DEFAULT_FETCHER = PageFetcher()
+        return _DEFAULT_FETCHER
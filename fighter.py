@@ -5,9 +5,25 @@
     It includes tools to retrieve fighter information, stats, and history from web pages.
 """
 
-from typing import List
-from bs4 import BeautifulSoup
-import requests
+from typing import TYPE_CHECKING, Dict, List, Optional
+from bs4 import BeautifulSoup, SoupStrainer
+from fetcher import PageFetcher, default_fetcher
+from history import FightHistory
+from instrumentation import METRICS, timed
+from stat_tables import StatTable, extract_stat_tables
+
+if TYPE_CHECKING:  # The numpy-backed modules are imported on first use to keep startup fast
+    from compact import CompactFighter
+    from stat_matrix import StatMatrix
+
+NAME_NOT_FOUND = 'Fighter Name Not Found'
+# Restricted parses only build the subtrees the getters read
+STATS_STRAINER = SoupStrainer(['thead', 'tbody'])
+HISTORY_STRAINER = SoupStrainer(
+    ['tbody', 'h1', 'div'],
+    class_=['Table__TBODY',
+            'PlayerHeader__Name flex flex-column ttu fw-bold pr4 h2',
+            'StatBlockInner__Value tc fw-medium n2 clr-gray-02'])
 
 
 class FighterData:
@@ -15,17 +31,26 @@ class FighterData:
         Represents a fighter's data, providing methods to extract and process information.
 
         Attributes:
+            fighter_id (str): The ESPN id of the fighter.
             stats_url (str): The URL of the fighter's stats page.
             history_url (str): The URL of the fighter's history page.
             name (str): The name of the fighter.
             soup (BeautifulSoup): The BeautifulSoup object for the fighter's page.
             history_soup (BeautifulSoup): The BeautifulSoup object for the fighter's history page.
-            stats_resource (object): The resource object for the fighter's stats.
-            history_resource (object): The resource object for the fighter's history.
+            stats_resource (bytes): The downloaded body of the fighter's stats page.
+            history_resource (bytes): The downloaded body of the fighter's history page.
+            fetcher (PageFetcher): The fetcher used to download the pages.
+            fight_history (FightHistory): The extracted fight history, built on first use.
+            stat_tables (dict): The extracted StatTable of each stat type, built on first use.
+            parse_only (bool): Whether pages are parsed into just the subtrees the getters read.
+
+        Pages are fetched and parsed lazily, the first time a getter needs them.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, fetcher: Optional[PageFetcher] = None,
+                 parse_only: bool = False) -> None:
         """Initializes a new instance of the class."""
+        self.fighter_id = None
         self.stats_url = None
         self.history_url = None
         self.name = None
@@ -33,6 +58,10 @@ class FighterData:
         self.history_soup = None
         self.stats_resource = None
         self.history_resource = None
+        self.fetcher = fetcher
+        self.fight_history = None
+        self.stat_tables = None
+        self.parse_only = parse_only
 
     @staticmethod
     def extract_fighter_id(url: str) -> str:
@@ -46,111 +75,123 @@ class FighterData:
 
     def set_url_from_id(self, fighter_id) -> None:
         """Sets the URLs after taking in a fighter ID"""
+        self.fighter_id = str(fighter_id)
         self.stats_url = f"espn.com/mma/fighter/stats/_/id/{fighter_id}"
         self.history_url = f"espn.com/mma/fighter/history/_/id/{fighter_id}"
 
     def set_url_from_page(self, fighter_page) -> None:
         """Takes in a URL and sets the URLs of the fighter"""
-        fighter_id = self.extract_fighter_id(fighter_page)
-        self.stats_url = f"espn.com/mma/fighter/stats/_/id/{fighter_id}"
-        self.history_url = f"espn.com/mma/fighter/history/_/id/{fighter_id}"
+        self.set_url_from_id(self.extract_fighter_id(fighter_page))
+
+    def get_fetcher(self) -> PageFetcher:
+        """Gets the fetcher of the fighter, falling back to the shared one"""
+        if self.fetcher is None:
+            self.fetcher = default_fetcher()
+        return self.fetcher
+
+    @timed('fetch_stats')
+    def fetch_stats(self) -> bytes:
+        """Downloads the fighter's stats page"""
+        self.stats_resource = self.get_fetcher().fetch(f"https://{self.stats_url}")
+        return self.stats_resource
 
+    @timed('fetch_history')
+    def fetch_history(self) -> bytes:
+        """Downloads the fighter's history page"""
+        self.history_resource = self.get_fetcher().fetch(
+            f"https://{self.history_url}")
+        return self.history_resource
+
+    @timed('set_resource')
     def set_resource(self):
         """
             Sets the resources for the fighter's stats by sending HTTP requests.
-            Uses a User-Agent as the header.
+            Both pages go through the fighter's fetcher so connections are reused.
         """
+        self.fetch_history()
+        return self.fetch_stats()
 
-        headers = {
-            'User-Agent': 'Mozilla/5.0'
-        }
-        stats_resource = requests.get(
-            f"https://{self.stats_url}", headers=headers, timeout=10)
-        history_resource = requests.get(
-            f"https://{self.history_url}", headers=headers, timeout=10)
-        self.stats_resource = stats_resource
-        self.history_resource = history_resource
-        return stats_resource
-
+    @timed('set_soup')
     def set_soup(self) -> None:
         """Sets the soup object from BS"""
-        self.soup = BeautifulSoup(
-            self.stats_resource.content,
-            features='html.parser')
-        self.history_soup = BeautifulSoup(
-            self.history_resource.content,
-            features='html.parser')
+        self.soup = None
+        self.history_soup = None
+        self.get_soup()
+        self.get_history_soup()
+
+    def get_soup(self) -> BeautifulSoup:
+        """Gets the soup of the stats page, fetching and parsing it on first use"""
+        if self.soup is None:
+            if self.stats_resource is None:
+                self.fetch_stats()
+            with METRICS.timer('parse.stats'):
+                self.soup = BeautifulSoup(
+                    self.stats_resource,
+                    features='html.parser',
+                    parse_only=STATS_STRAINER if self.parse_only else None)
+            self.stat_tables = None
+        return self.soup
+
+    def get_history_soup(self) -> BeautifulSoup:
+        """Gets the soup of the history page, fetching and parsing it on first use"""
+        if self.history_soup is None:
+            if self.history_resource is None:
+                self.fetch_history()
+            with METRICS.timer('parse.history'):
+                self.history_soup = BeautifulSoup(
+                    self.history_resource,
+                    features='html.parser',
+                    parse_only=HISTORY_STRAINER if self.parse_only else None)
+            self.fight_history = None
+        return self.history_soup
+
+    @timed('get_fight_history')
+    def get_fight_history(self) -> FightHistory:
+        """Gets the fight history, extracting the whole table in one pass on first use"""
+        if self.fight_history is None:
+            tbody = self.get_history_soup().find('tbody', {'class': 'Table__TBODY'})
+            self.fight_history = FightHistory.from_tbody(tbody)
+        return self.fight_history
 
+    @timed('get_opponents')
     def get_opponents(self) -> List[str]:
         """Gets the opponents which the fighter has fought"""
-        tbody = self.history_soup.find('tbody', {'class': 'Table__TBODY'})
-        if tbody is not None:
-            anchors = tbody.find_all('a', {'class': 'AnchorLink tl'})
-            opponents = [anchor.text for anchor in anchors]
-            return opponents
-        return []
+        return self.get_fight_history().opponents
 
+    @timed('get_opponent_ids')
+    def get_opponent_ids(self) -> List[Optional[str]]:
+        """Gets the ESPN ids of the opponents which the fighter has fought"""
+        return self.get_fight_history().opponent_ids
+
+    @timed('get_results')
     def get_results(self) -> List[str]:
         """Gets the result of the fight, either a W, L, D or NC"""
-        tbody = self.history_soup.find('tbody', {'class': 'Table__TBODY'})
-        if tbody is not None:
-            divs = tbody.find_all('div', {'class': 'ResultCell'})
-            results = [div.text for div in divs]
-            return results
-        return []
+        return self.get_fight_history().results
 
+    @timed('get_methods')
     def get_methods(self) -> List[str]:
         """Gets the method how the fight ended"""
-        tbody = self.history_soup.find('tbody', {'class': 'Table__TBODY'})
-        if tbody is not None:
-            divs = tbody.find_all('div',
-                                  {'class': 'FightHistoryCard__Decision tl'})
-            methods = [div.text for div in divs]
-            return methods
-        return []
+        return self.get_fight_history().methods
 
+    @timed('get_round')
     def get_round(self) -> List[str]:
         """Gets the round which the fight ended"""
-        tbody = self.history_soup.find('tbody', {'class': 'Table__TBODY'})
-        if tbody is not None:
-            rows = tbody.find_all('tr')
-            round_end = []
-            for row in rows:
-                tds = row.find_all('td', {'class': 'Table__TD'})
-                round_number = tds[-3].text
-                round_end.append((round_number))
-            return round_end
-        return []
+        return self.get_fight_history().rounds
 
+    @timed('get_time')
     def get_time(self) -> List[str]:
         """Gets the time in the round which it ended"""
-        tbody = self.history_soup.find('tbody', {'class': 'Table__TBODY'})
-        if tbody is not None:
-            rows = tbody.find_all('tr')
-            time = []
-            for row in rows:
-                tds = row.find_all('td', {'class': 'Table__TD'})
-                end_time = tds[-2].text
-                time.append((end_time))
-            return time
-        return []
+        return self.get_fight_history().times
 
+    @timed('get_event')
     def get_event(self) -> List[str]:
         """Gets the event that a fighter fought at"""
-        tbody = self.history_soup.find('tbody', {'class': 'Table__TBODY'})
-        if tbody is not None:
-            rows = tbody.find_all('tr')
-            events = []
-            for row in rows:
-                tds = row.find_all('td', {'class': 'Table__TD'})
-                event = tds[-1].text
-                events.append((event))
-            return events
-        return []
+        return self.get_fight_history().events
 
+    @timed('get_record')
     def get_record(self) -> List[str]:
         """Gets a fighter's record in the formal W-L-D"""
-        records = self.history_soup.find_all(
+        records = self.get_history_soup().find_all(
             'div', {'class': 'StatBlockInner__Value tc fw-medium n2 clr-gray-02'}, limit=3)
         record_texts = []
         if records:
@@ -158,111 +199,94 @@ class FighterData:
                 record_texts.append(record.text)
         return record_texts
 
+    @timed('get_name')
     def get_name(self) -> str:
         """Gets the name of a fighter after taking in their ID"""
-        fighter_name_element = self.history_soup.find(
+        fighter_name_element = self.get_history_soup().find(
             'h1', {'class': 'PlayerHeader__Name flex flex-column ttu fw-bold pr4 h2'})
         if fighter_name_element is not None:
             fighter_name = ' '.join(child.get_text()
                                     for child in fighter_name_element.children)
         else:
-            fighter_name = 'Fighter Name Not Found'
+            fighter_name = NAME_NOT_FOUND
         return fighter_name
 
+    @timed('get_stat_tables')
+    def get_stat_tables(self) -> Dict[str, StatTable]:
+        """Gets every stats table of the stats page, extracted in one pass on first use"""
+        if self.stat_tables is None:
+            self.stat_tables = extract_stat_tables(self.get_soup())
+        return self.stat_tables
+
+    def get_stat_table(self, stat_type: str) -> StatTable:
+        """Gets the 'striking', 'clinch' or 'ground' table, raising IndexError if missing"""
+        tables = self.get_stat_tables()
+        if stat_type not in tables:
+            raise IndexError(f"No {stat_type} table for fighter {self.fighter_id}")
+        return tables[stat_type]
+
+    def get_stat_bouts(self, stat_type: str) -> List[Optional[int]]:
+        """Gets the index in the fight history of the bout of each row of a stats table"""
+        return self.get_stat_table(stat_type).bout_indexes(self.get_fight_history())
+
+    @timed('get_striking')
     def get_striking(self) -> tuple[List[str], List[List[str]]]:
         """Gets the striking statistics of a fighter"""
-        tbody = self.soup.find_all('tbody', {'class': 'Table__TBODY'})
-        striking_stats = []
-        striking_table = tbody[0]
-        table_row = striking_table.find_all(
-            'tr', {'class': 'Table__TR Table__TR--sm Table__even'})
-        table_headings = self.soup.find_all(
-            'tr', {'class': 'Table__TR Table__even'})
-        table_heading = table_headings[0].find_all(
-            'th', {'class': 'Table__TH'})
-        headings = []
-        for index, heading in enumerate(table_heading):
-            if index >= 4:
-                headings.append(heading.text.strip())
-        for row in table_row:
-            stat_row = []
-            stat_value = row.find_all('td', {'class': 'tar Table__TD'})
-            for stat in stat_value:
-                stat_row.append(stat.text)
-            striking_stats.append(stat_row)
-        return headings, striking_stats
+        table = self.get_stat_table('striking')
+        return table.headings, table.rows
 
+    @timed('get_clinch')
     def get_clinch(self) -> tuple[List[str], List[List[str]]]:
         """Gets the clinch statistics of a fighter"""
-        tbody = self.soup.find_all('tbody', {'class': 'Table__TBODY'})
-        clinch_stats = []
-        clinch_table = tbody[1]
-        table_row = clinch_table.find_all(
-            'tr', {'class': 'Table__TR Table__TR--sm Table__even'})
-        table_headings = self.soup.find_all(
-            'tr', {'class': 'Table__TR Table__even'})
-        table_heading = table_headings[1].find_all(
-            'th', {'class': 'Table__TH'})
-
-        headings = []
-        for index, heading in enumerate(table_heading):
-            if index >= 4:
-                headings.append(heading.text.strip())
-
-        for row in table_row:
-            stat_row = []
-            stat_value = row.find_all('td', {'class': 'tar Table__TD'})
-            for stat in stat_value:
-                stat_row.append(stat.text)
-            clinch_stats.append(stat_row)
-
-        return headings, clinch_stats
+        table = self.get_stat_table('clinch')
+        return table.headings, table.rows
 
+    @timed('get_ground')
     def get_ground(self) -> tuple[List[str], List[List[str]]]:
         """Gets the ground statistics of a fighter"""
-        tbody = self.soup.find_all('tbody', {'class': 'Table__TBODY'})
-        ground_stats = []
-        ground_table = tbody[2]
-        table_row = ground_table.find_all(
-            'tr', {'class': 'Table__TR Table__TR--sm Table__even'})
-        table_headings = self.soup.find_all(
-            'tr', {'class': 'Table__TR Table__even'})
-        table_heading = table_headings[2].find_all(
-            'th', {'class': 'Table__TH'})
-        headings = []
-        for index, heading in enumerate(table_heading):
-            if index >= 4:
-                headings.append(heading.text.strip())
-        for row in table_row:
-            stat_row = []
-            stat_value = row.find_all('td', {'class': 'tar Table__TD'})
-            for stat in stat_value:
-                stat_row.append(stat.text)
-            ground_stats.append(stat_row)
-        return headings, ground_stats
+        table = self.get_stat_table('ground')
+        return table.headings, table.rows
+
+    @timed('get_stat_matrix')
+    def get_stat_matrix(self, stat_type: str) -> 'StatMatrix':
+        """Gets the 'striking', 'clinch' or 'ground' statistics as a typed StatMatrix"""
+        from stat_matrix import StatMatrix
+        headings, stats = getattr(self, f'get_{stat_type}')()
+        return StatMatrix.from_table(headings, stats)
 
+    @timed('find_column_avg')
     def find_column_avg(self, stats: List[List[str]]) -> List[float]:
         """Finds the average of a column in the statistics table"""
-        num_row = len(stats[0])
-        col_sums = [0.0] * num_row
-        col_counts = [0] * num_row
-        for row in stats:
-            for i, value in enumerate(row):
-                if value == '-':  # Case where the stat is -
-                    continue
-                if '/' in value:
-                    numeric_value = float(value.split('/')[0])
-                    col_sums[i] += numeric_value
-                    col_counts[i] += 1
-                elif '%' in value:
-                    numeric_value = float(value.strip('%'))
-                    col_sums[i] += numeric_value
-                    col_counts[i] += 1
-                else:
-                    numeric_value = float(value)
-                    col_sums[i] += numeric_value
-                    col_counts[i] += 1
-
-        column_avg = [col_sums[i] / col_counts[i]
-                      if col_counts[i] != 0 else 0 for i in range(num_row)]
-        return column_avg
+        if not stats:
+            return []
+        from stat_matrix import StatMatrix
+        matrix = StatMatrix.from_table([''] * max(len(row) for row in stats), stats)
+        return matrix.mean().tolist()
+
+    def release(self) -> None:
+        """Drops the downloaded pages and parse trees, keeping anything already extracted"""
+        for soup in (self.soup, self.history_soup):
+            if soup is not None:
+                soup.decompose()  # Breaks the tree's reference cycles so it is freed at once
+        self.soup = None
+        self.history_soup = None
+        self.stats_resource = None
+        self.history_resource = None
+
+    @timed('compact')
+    def compact(self, release: bool = True) -> 'CompactFighter':
+        """
+            Extracts everything into a memory-bounded CompactFighter, fetching any page that
+            is still missing. The pages and parse trees are released afterwards by default.
+        """
+        from compact import CompactFighter, CompactTable
+        history = self.get_fight_history()
+        tables = {stat_type: CompactTable(table.headings, table.rows,
+                                          table.bout_indexes(history))
+                  for stat_type, table in self.get_stat_tables().items()}
+        history = CompactFighter.intern_history(history)
+        fighter = CompactFighter(self.fighter_id, self.get_name(), self.get_record(),
+                                 history, tables)
+        if release:
+            self.release()
+        return fighter
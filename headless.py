@@ -0,0 +1,159 @@
+"""
+    Headless Module
+
+    This module runs the scraper without any prompts.
+    Fighters are loaded concurrently and streamed one record at a time as NDJSON or CSV,
+    so memory stays flat however many fighter ids are passed in.
+"""
+
+import csv
+import json
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO
+from batch import FighterBatch
+from cache import ResponseCache
+from fetcher import PageFetcher
+from fighter import FighterData
+from name_index import NameIndex
+from ratelimit import FetchError
+from stat_tables import STAT_TYPES
+
+TABLES = ['record', 'history'] + STAT_TYPES
+HISTORY_COLUMNS = ['date', 'opponent', 'opponent_id', 'result', 'method', 'round',
+                   'time', 'event']
+RECORD_FIELDS = ['record', 'ko_tko', 'submissions']
+
+
+def read_ids(path: str) -> Iterator[str]:
+    """Lazily reads fighter ids or ESPN URLs, one per line, from a file or '-' for stdin"""
+    stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        for line in stream:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            yield FighterData.extract_fighter_id(line) if '/id/' in line else line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def fighter_record(fighter: FighterData, tables: Sequence[str]) -> Dict:
+    """Builds a plain dictionary of the requested tables of a fighter"""
+    record = {'fighter_id': fighter.fighter_id, 'name': fighter.get_name()}
+    for table in tables:
+        if table == 'record':
+            record['record'] = dict(zip(RECORD_FIELDS, fighter.get_record()))
+        elif table == 'history':
+            history = fighter.get_fight_history()
+            columns = [history.dates, history.opponents, history.opponent_ids,
+                       history.results, history.methods, history.rounds,
+                       history.times, history.events]
+            record['history'] = [dict(zip(HISTORY_COLUMNS, bout))
+                                 for bout in zip(*columns)]
+        else:
+            headings, stats = getattr(fighter, f'get_{table}')()
+            # `bout` is the index of the row's fight in the history table, or None
+            record[table] = [{'bout': bout, **dict(zip(headings, row))}
+                             for bout, row in zip(fighter.get_stat_bouts(table), stats)]
+    return record
+
+
+class NdjsonWriter:
+    """Writes one JSON object per fighter per line"""
+
+    def __init__(self, stream: TextIO) -> None:
+        """Initializes the writer on an open text stream"""
+        self.stream = stream
+
+    def write(self, record: Dict) -> None:
+        """Writes and flushes the record of a fighter"""
+        self.stream.write(json.dumps(record) + '\n')
+        self.stream.flush()
+
+
+class CsvWriter:
+    """
+        Writes fighters as long-format CSV, one line per table cell, since each table has
+        different columns. Lines are fighter_id, name, table, row, field, value.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        """Initializes the writer on an open text stream and writes the header"""
+        self.stream = stream
+        self.writer = csv.writer(stream)
+        self.writer.writerow(['fighter_id', 'name', 'table', 'row', 'field', 'value'])
+
+    def write(self, record: Dict) -> None:
+        """Writes and flushes the record of a fighter"""
+        prefix = [record['fighter_id'], record['name']]
+        for table in TABLES:
+            rows = record.get(table)
+            if rows is None:
+                continue
+            if isinstance(rows, dict):
+                rows = [rows]
+            for index, row in enumerate(rows):
+                self.writer.writerows(prefix + [table, index, field, value]
+                                      for field, value in row.items())
+        self.stream.flush()
+
+
+WRITERS = {'ndjson': NdjsonWriter, 'csv': CsvWriter}
+
+
+def required_pages(tables: Sequence[str]) -> List[str]:
+    """Gets the pages that must be downloaded for the requested tables"""
+    pages = ['history']  # The name is read from the history page
+    if any(table in STAT_TYPES for table in tables):
+        pages.append('stats')
+    return pages
+
+
+def create_batch(tables: Sequence[str], workers: int = 8,
+                 use_cache: bool = True) -> FighterBatch:
+    """Creates a batch that downloads the pages needed for the requested tables"""
+    fetcher = PageFetcher(pool_size=workers,
+                          cache=ResponseCache() if use_cache else None)
+    return FighterBatch(max_workers=workers, fetcher=fetcher,
+                        pages=required_pages(tables), parse_only=True)
+
+
+def run_headless(fighters: Iterable[FighterData], batch: FighterBatch,
+                 tables: Sequence[str], output_format: str, output: TextIO,
+                 database_path: Optional[str] = None,
+                 name_index: Optional[NameIndex] = None) -> int:
+    """
+        Streams a record for each fighter to the output as soon as it has loaded,
+        saving it to the database too if a path is given, and recording the names on its
+        page in the name index if one is given. Fighters come from the batch,
+        either directly or through a crawl, or from an ArchiveReparser passed as the batch.
+        Failures are reported on stderr. Returns the number of fighters that failed.
+    """
+    writer = WRITERS[output_format](output)
+    database = None
+    if database_path is not None:
+        from database import FighterDatabase  # Deferred, most runs do not sync a database
+        database = FighterDatabase(database_path)
+    failures = 0
+    for fighter in fighters:
+        try:
+            writer.write(fighter_record(fighter, tables))
+            if database is not None:
+                database.save(fighter, include_stats='stats' in batch.pages)
+            if name_index is not None:
+                name_index.add_fighter(fighter)
+        except IndexError:
+            failures += 1
+            print(f"Fighter {fighter.fighter_id}: page is missing a requested table",
+                  file=sys.stderr)
+        except FetchError as error:
+            failures += 1
+            print(f"Fighter {fighter.fighter_id}: {error}", file=sys.stderr)
+    if database is not None:
+        database.close()
+    if name_index is not None:
+        name_index.close()
+    for fighter_id, error in batch.errors.items():
+        print(f"Fighter {fighter_id}: {error}", file=sys.stderr)
+    return failures + len(batch.errors)
@@ -0,0 +1,79 @@
+"""
+    History Module
+
+    This module extracts a fighter's fight history table in a single pass.
+    Every row is walked once and its cells are stored column by column in a FightHistory.
+"""
+
+import re
+from typing import List, Optional
+from bs4 import Tag
+
+OPPONENT_ID_PATTERN = re.compile(r'/id/(\d+)')
+
+
+def _text(tag: Optional[Tag]) -> str:
+    """Gets the text of a tag, or an empty string if the tag is missing"""
+    return tag.text if tag is not None else ''
+
+
+class FightHistory:
+    """
+        A fighter's fight history stored as one list per column, most recent fight first.
+
+        Attributes:
+            dates (list): The date of each fight.
+            opponents (list): The name of each opponent.
+            opponent_ids (list): The ESPN id of each opponent, or None if it has no link.
+            results (list): The result of each fight, either a W, L, D or NC.
+            methods (list): The method each fight ended by.
+            rounds (list): The round each fight ended in.
+            times (list): The time in the round each fight ended at.
+            events (list): The event each fight took place at.
+    """
+
+    __slots__ = ('dates', 'opponents', 'opponent_ids', 'results', 'methods',
+                 'rounds', 'times', 'events')
+
+    def __init__(self) -> None:
+        """Initializes an empty fight history"""
+        self.dates: List[str] = []
+        self.opponents: List[str] = []
+        self.opponent_ids: List[Optional[str]] = []
+        self.results: List[str] = []
+        self.methods: List[str] = []
+        self.rounds: List[str] = []
+        self.times: List[str] = []
+        self.events: List[str] = []
+
+    def __len__(self) -> int:
+        """Gets the number of fights in the history"""
+        return len(self.results)
+
+    @classmethod
+    def from_tbody(cls, tbody: Optional[Tag]) -> 'FightHistory':
+        """Builds a fight history by walking each row of the history table once"""
+        history = cls()
+        if tbody is None:
+            return history
+        for row in tbody.find_all('tr'):
+            tds = row.find_all('td', {'class': 'Table__TD'})
+            if len(tds) < 3:
+                continue
+            anchor = row.find('a', {'class': 'AnchorLink tl'})
+            opponent_id = None
+            if anchor is not None:
+                match = OPPONENT_ID_PATTERN.search(anchor.get('href', ''))
+                if match:
+                    opponent_id = match.group(1)
+            history.dates.append(tds[0].text)
+            # An opponent without an ESPN page has no link, only the name in its cell
+            history.opponents.append(anchor.text if anchor is not None else tds[1].text)
+            history.opponent_ids.append(opponent_id)
+            history.results.append(_text(row.find('div', {'class': 'ResultCell'})))
+            history.methods.append(_text(
+                row.find('div', {'class': 'FightHistoryCard__Decision tl'})))
+            history.rounds.append(tds[-3].text)
+            history.times.append(tds[-2].text)
+            history.events.append(tds[-1].text)
+        return history
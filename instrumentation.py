@@ -0,0 +1,179 @@
+"""
+    Instrumentation Module
+
+    This module records per-stage timings and counters for the scraper.
+    Fetching, parsing, extraction and rendering report into the shared METRICS registry,
+    which can be read from Python or printed as a summary with the --profile flag.
+    Recording is off until enable() is called, so normal runs only pay for a flag check.
+"""
+
+import functools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+MAX_SAMPLES = 10000
+
+
+class StageTimer:
+    """
+        The timings of one stage. Count, total and max are exact; percentiles come from
+        a uniform reservoir of at most MAX_SAMPLES durations so memory stays bounded.
+
+        Attributes:
+            count (int): The number of times the stage ran.
+            total (float): The total seconds spent in the stage.
+            max (float): The longest single run in seconds.
+            samples (list): The reservoir of sampled durations in seconds.
+    """
+
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self) -> None:
+        """Initializes a timer with no runs"""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: List[float] = []
+
+    def add(self, seconds: float) -> None:
+        """Records one run of the stage"""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            index = random.randrange(self.count)
+            if index < MAX_SAMPLES:
+                self.samples[index] = seconds
+
+    def percentile(self, percent: float) -> float:
+        """Gets a percentile of the sampled durations using the nearest rank"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+
+class Metrics:
+    """
+        A thread-safe registry of stage timers and counters.
+
+        Attributes:
+            enabled (bool): Whether timings and counters are being recorded.
+            timers (dict): The StageTimer of each stage name.
+            counters (dict): The value of each counter name, such as bytes or cache hits.
+
+        Stage timings are inclusive, so a stage that triggers another, like a getter that
+        parses its page on first use, includes the time of the inner stage.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty, disabled registry"""
+        self.enabled = False
+        self.timers: Dict[str, StageTimer] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Records a duration for a stage"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if stage not in self.timers:
+                self.timers[stage] = StageTimer()
+            self.timers[stage].add(seconds)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Adds to a counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Times the body of a with block as a stage"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def reset(self) -> None:
+        """Clears every timer and counter"""
+        with self._lock:
+            self.timers = {}
+            self.counters = {}
+
+    def summary(self) -> Dict[str, Dict]:
+        """Gets the timers, with percentiles, and the counters as plain dictionaries"""
+        with self._lock:
+            timers = {
+                stage: {
+                    'count': timer.count,
+                    'total_s': timer.total,
+                    'mean_s': timer.total / timer.count,
+                    'p50_s': timer.percentile(50),
+                    'p90_s': timer.percentile(90),
+                    'p99_s': timer.percentile(99),
+                    'max_s': timer.max,
+                }
+                for stage, timer in self.timers.items()
+            }
+            return {'timers': timers, 'counters': dict(self.counters)}
+
+    def report(self) -> str:
+        """Formats the summary as a table sorted by total time"""
+        summary = self.summary()
+        lines = [f"{'stage':34} {'count':>7} {'total s':>9} {'mean ms':>9} "
+                 f"{'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for stage, timer in sorted(summary['timers'].items(),
+                                   key=lambda item: -item[1]['total_s']):
+            lines.append(
+                f"{stage:34} {timer['count']:7d} {timer['total_s']:9.3f} "
+                f"{timer['mean_s'] * 1000:9.2f} {timer['p50_s'] * 1000:9.2f} "
+                f"{timer['p90_s'] * 1000:9.2f} {timer['p99_s'] * 1000:9.2f} "
+                f"{timer['max_s'] * 1000:9.2f}")
+        if summary['counters']:
+            lines.append('')
+            lines.append(f"{'counter':34} {'value':>12}")
+            for name, value in sorted(summary['counters'].items()):
+                lines.append(f"{name:34} {value:12d}")
+        return '\n'.join(lines)
+
+
+METRICS = Metrics()
+
+
+def enable() -> None:
+    """Starts recording timings and counters"""
+    METRICS.enabled = True
+
+
+def disable() -> None:
+    """Stops recording timings and counters"""
+    METRICS.enabled = False
+
+
+def timed(stage: str) -> Callable:
+    """Decorates a function so each call is recorded as a stage"""
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                METRICS.record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
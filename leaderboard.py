@@ -0,0 +1,128 @@
+"""
+    Leaderboard Module
+
+    This module compares any number of fighters at once.
+    Each fighter's average stats are computed once into a fighters x stats matrix, and
+    ranking, percentile and top-k queries are vectorized operations over that matrix.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from fighter import FighterData
+from stat_tables import STAT_TYPES
+
+
+class FighterComparison:
+    """
+        A fighters x stats matrix of per-fighter averages.
+
+        Attributes:
+            fighter_ids (list): The id of the fighter on each row.
+            names (list): The name of the fighter on each row.
+            columns (list): The (stat type, heading) pair of each column.
+            matrix (numpy.ndarray): The average of each stat for each fighter, NaN where a
+                fighter has no value for a stat.
+    """
+
+    def __init__(self, fighters: Iterable[FighterData],
+                 stat_types: Sequence[str] = STAT_TYPES) -> None:
+        """Extracts and averages every stats table of each fighter once"""
+        self.fighter_ids: List[str] = []
+        self.names: List[str] = []
+        self.columns: List[Tuple[str, str]] = []
+        self._column_index: Dict[str, int] = {}
+        rows: List[Dict[int, float]] = []
+        for fighter in fighters:
+            self.fighter_ids.append(fighter.fighter_id)
+            self.names.append(fighter.get_name())
+            row = {}
+            for stat_type in stat_types:
+                try:
+                    matrix = fighter.get_stat_matrix(stat_type)
+                except IndexError:
+                    continue  # The fighter has no table of this type
+                for heading, value in zip(matrix.headings, matrix.mean(empty=np.nan)):
+                    row[self._add_column(stat_type, heading)] = value
+            rows.append(row)
+        self.matrix = np.full((len(rows), len(self.columns)), np.nan)
+        for index, row in enumerate(rows):
+            self.matrix[index, list(row)] = list(row.values())
+        self._row_index = {fighter_id: index
+                           for index, fighter_id in enumerate(self.fighter_ids)}
+
+    def _add_column(self, stat_type: str, heading: str) -> int:
+        """Gets the index of a stat's column, adding the column if it is new"""
+        key = f"{stat_type}:{heading}"
+        if key not in self._column_index:
+            self._column_index[key] = len(self.columns)
+            self._column_index.setdefault(heading, len(self.columns))
+            self.columns.append((stat_type, heading))
+        return self._column_index[key]
+
+    def column(self, stat: str) -> int:
+        """Gets the column index of a stat given as 'heading' or 'stat_type:heading'"""
+        if stat not in self._column_index:
+            raise KeyError(f"Unknown stat {stat!r}")
+        return self._column_index[stat]
+
+    def values(self, stat: str) -> np.ndarray:
+        """Gets every fighter's average for a stat"""
+        return self.matrix[:, self.column(stat)]
+
+    def _rows(self, fighter_ids: Optional[Iterable[str]]) -> np.ndarray:
+        """Gets the row indexes of the given fighters, or of every fighter"""
+        if fighter_ids is None:
+            return np.arange(len(self.fighter_ids))
+        return np.array([self._row_index[str(fighter_id)] for fighter_id in fighter_ids],
+                        dtype=int)
+
+    def ranks(self, stat: str, ascending: bool = False) -> np.ndarray:
+        """
+            Gets each fighter's rank for a stat, 1 being the highest value (or the lowest if
+            ascending). Fighters without a value rank last.
+        """
+        values = self.values(stat)
+        keys = np.where(np.isnan(values), np.inf, values if ascending else -values)
+        ranks = np.empty(len(values), dtype=int)
+        ranks[np.argsort(keys, kind='stable')] = np.arange(1, len(values) + 1)
+        return ranks
+
+    def percentiles(self) -> np.ndarray:
+        """
+            Gets the percentile of every value within its column, the share of fighters with a
+            value at or below it. NaN stays NaN.
+        """
+        result = np.full(self.matrix.shape, np.nan)
+        for column in range(self.matrix.shape[1]):
+            values = self.matrix[:, column]
+            present = ~np.isnan(values)
+            ordered = np.sort(values[present])
+            if ordered.size:
+                result[present, column] = (np.searchsorted(ordered, values[present],
+                                                           side='right')
+                                           / ordered.size * 100)
+        return result
+
+    def top_k(self, stat: str, k: int = 10, fighter_ids: Optional[Iterable[str]] = None,
+              ascending: bool = False) -> List[Tuple[str, str, float]]:
+        """Gets the (fighter id, name, value) of the best k fighters for a stat within a set"""
+        rows = self._rows(fighter_ids)
+        values = self.matrix[rows, self.column(stat)]
+        rows, values = rows[~np.isnan(values)], values[~np.isnan(values)]
+        keys = values if ascending else -values
+        k = min(k, len(rows))
+        if k == 0:
+            return []
+        best = np.argpartition(keys, k - 1)[:k]
+        best = best[np.argsort(keys[best], kind='stable')]
+        return [(self.fighter_ids[rows[index]], self.names[rows[index]],
+                 float(values[index])) for index in best]
+
+    def stat_table(self, stat_type: str,
+                   fighter_ids: Optional[Iterable[str]] = None) -> Tuple[List[str], np.ndarray]:
+        """Gets the headings and the fighters x headings averages of one stat type"""
+        columns = [index for index, (column_type, _) in enumerate(self.columns)
+                   if column_type == stat_type]
+        rows = self._rows(fighter_ids)
+        return ([self.columns[index][1] for index in columns],
+                self.matrix[np.ix_(rows, columns)])
@@ -0,0 +1,262 @@
+"""
+    Name Index Module
+
+    This module keeps a local index of fighter names to ESPN ids so fighters can be looked
+    up by name without a browser or any network call.
+    Names are collected from every fighter scraped and every opponent link on their history
+    pages, and appended to a tab separated file so the index grows incrementally. Lookups go
+    through a sorted list of name words for prefixes and a trigram index of the distinct
+    words for misspellings.
+"""
+
+import heapq
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from fighter import NAME_NOT_FOUND
+
+DEFAULT_NAME_INDEX_PATH = os.path.join(
+    os.path.expanduser('~'), '.local', 'share', 'mma-data-scraper', 'names.tsv')
+MIN_SIMILARITY = 0.4
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+TOKEN_END = '\x7f'  # Sorts after every character a token or fighter id can contain
+
+
+def normalize(name: str) -> str:
+    """Lowercases a name and drops accents and punctuation, so 'José Aldo' is 'jose aldo'"""
+    if not name.isascii():
+        decomposed = unicodedata.normalize('NFKD', name)
+        name = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(TOKEN_PATTERN.findall(name.lower()))
+
+
+def trigrams(token: str) -> Set[str]:
+    """Gets the three letter sequences of a word, padded so its start counts double"""
+    padded = f"  {token} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+def similarity(word_trigrams: Set[str], shared: int, token: str) -> float:
+    """Gets the Dice coefficient of a word's trigrams and a token sharing `shared` of them"""
+    return 2 * shared / (len(word_trigrams) + len(token) + 1)
+
+
+class NameIndex:
+    """
+        A persistent name to fighter id index with prefix and fuzzy search.
+
+        Attributes:
+            path (str): The tab separated file of fighter ids and names, or None to keep
+                the index in memory only.
+            names (dict): The latest name seen for each fighter id.
+
+        The file is only ever appended to and is read on first use. The search indexes
+        are built by the first search, or ahead of time by warm(), and then kept up to
+        date as names are added.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_NAME_INDEX_PATH) -> None:
+        """Initializes the index, reading the file on first use"""
+        self.path = path
+        self.names: Dict[str, str] = {}
+        self._normalized: Dict[str, str] = {}
+        self._loaded = False
+        self._log = None
+        self._lock = threading.RLock()
+        self._tokens: Optional[List[Tuple[str, str]]] = None
+        self._unsorted: List[Tuple[str, str]] = []
+        self._trigrams: Optional[Dict[str, List[str]]] = None
+        self._indexed_tokens: Set[str] = set()
+
+    def __len__(self) -> int:
+        """Gets the number of fighters in the index"""
+        self._load()
+        return len(self.names)
+
+    def _load(self) -> None:
+        """Reads the file once, the last line for a fighter id winning"""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if self.path is None or not os.path.exists(self.path):
+                return
+            lines = 0
+            with open(self.path, encoding='utf-8') as names_file:
+                for line in names_file:
+                    fighter_id, _, name = line.rstrip('\n').partition('\t')
+                    if fighter_id and name:
+                        self.names[fighter_id] = name
+                        lines += 1
+            self._normalized = {fighter_id: normalize(name)
+                                for fighter_id, name in self.names.items()}
+            if lines > 2 * len(self.names) + 1000:
+                self.rewrite()
+
+    def rewrite(self) -> None:
+        """Atomically rewrites the file with one line per fighter, dropping old names"""
+        if self.path is None:
+            return
+        with self._lock:
+            self.close()
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as names_file:
+                names_file.writelines(f"{fighter_id}\t{name}\n"
+                                      for fighter_id, name in self.names.items())
+            os.replace(temp_path, self.path)
+
+    def add(self, fighter_id: Optional[str], name: Optional[str]) -> bool:
+        """Records a fighter's name, returning whether it was new or changed"""
+        self._load()
+        if not fighter_id or not name:
+            return False
+        name = ' '.join(name.split())
+        with self._lock:
+            if self.names.get(fighter_id) == name:
+                return False
+            normalized = normalize(name)
+            self.names[fighter_id] = name
+            self._normalized[fighter_id] = normalized
+            # Words of a previous name stay indexed and are filtered out on search
+            if self._tokens is not None:
+                self._unsorted.extend((token, fighter_id) for token in normalized.split())
+            if self._trigrams is not None:
+                self._index_trigrams(normalized.split())
+            if self.path is not None:
+                if self._log is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    self._log = open(self.path, 'a', encoding='utf-8')
+                self._log.write(f"{fighter_id}\t{name}\n")
+        return True
+
+    def add_fighter(self, fighter) -> int:
+        """
+            Records the name of a FighterData or CompactFighter and of every linked
+            opponent on its history page. Returns the number of names that were new or changed.
+        """
+        name = fighter.get_name()
+        added = int(name != NAME_NOT_FOUND and self.add(fighter.fighter_id, name))
+        for opponent_id, opponent in zip(fighter.get_opponent_ids(), fighter.get_opponents()):
+            added += self.add(opponent_id, opponent)
+        return added
+
+    def _index_trigrams(self, tokens: Iterable[str]) -> None:
+        """Adds the trigrams of each token not indexed yet"""
+        for token in tokens:
+            if token not in self._indexed_tokens:
+                self._indexed_tokens.add(token)
+                for trigram in trigrams(token):
+                    self._trigrams[trigram].append(token)
+
+    def warm(self) -> None:
+        """Reads the file and builds the search indexes, e.g. on a background thread"""
+        self._load()
+        self._indexes()
+
+    def _indexes(self) -> Tuple[List[Tuple[str, str]], Dict[str, List[str]]]:
+        """
+            Gets the sorted (token, fighter id) list and the trigram to tokens index,
+            building them on first use and merging in tokens added since the last search.
+        """
+        with self._lock:
+            if self._tokens is None:
+                self._tokens = [(token, fighter_id)
+                                for fighter_id, normalized in self._normalized.items()
+                                for token in normalized.split()]
+                self._tokens.sort()
+            elif self._unsorted:
+                self._unsorted.sort()
+                self._tokens = list(heapq.merge(self._tokens, self._unsorted))
+                self._unsorted = []
+            if self._trigrams is None:
+                self._trigrams = defaultdict(list)
+                self._index_trigrams(token for token, _ in self._tokens)
+            return self._tokens, self._trigrams
+
+    def _ids_with_token(self, tokens: List[Tuple[str, str]], token: str,
+                        prefix: bool = False) -> Iterator[str]:
+        """Gets the ids of the fighters whose name has the word, or a word starting with it"""
+        start = bisect_left(tokens, (token,))
+        end = bisect_left(tokens, (token + TOKEN_END,) if prefix else (token, TOKEN_END))
+        for index in range(start, end):
+            yield tokens[index][1]
+
+    def _ranked(self, fighter_ids: Iterable[str], query: str,
+                limit: int) -> List[Tuple[str, str]]:
+        """Orders matches exact name first, then names starting with the query, then shortest"""
+        def rank(fighter_id):
+            normalized = self._normalized[fighter_id]
+            return (normalized != query, not normalized.startswith(query), len(normalized),
+                    normalized, fighter_id)
+        return [(fighter_id, self.names[fighter_id])
+                for fighter_id in heapq.nsmallest(limit, fighter_ids, key=rank)]
+
+    def prefix(self, query: str, limit: int = 10) -> List[Tuple[str, str]]:
+        """
+            Gets the (fighter id, name) of fighters where every word of the query starts
+            one of the words of their name, e.g. 'con mcg' finds 'Conor McGregor'.
+        """
+        self._load()
+        query = normalize(query)
+        words = sorted(query.split(), key=len, reverse=True)
+        if not words:
+            return []
+        tokens, _ = self._indexes()
+        matches = set()
+        # The longest word matches the fewest tokens, the rest are checked per fighter
+        for fighter_id in self._ids_with_token(tokens, words[0], prefix=True):
+            names = self._normalized[fighter_id].split()
+            if all(any(name.startswith(word) for name in names) for word in words):
+                matches.add(fighter_id)
+        return self._ranked(matches, query, limit)
+
+    def fuzzy(self, query: str, limit: int = 10,
+              min_similarity: float = MIN_SIMILARITY) -> List[Tuple[str, str]]:
+        """
+            Gets the (fighter id, name) of the fighters whose name words are most alike the
+            words of the query by shared trigrams, for misspellings such as 'mcgergor'.
+        """
+        self._load()
+        words = normalize(query).split()
+        if not words:
+            return []
+        tokens, index = self._indexes()
+        scores: Counter = Counter()
+        for word in words:
+            word_trigrams = trigrams(word)
+            shared: Counter = Counter()
+            for trigram in word_trigrams:
+                shared.update(index.get(trigram, ()))
+            best: Dict[str, float] = {}
+            for token, count in shared.items():
+                score = similarity(word_trigrams, count, token)
+                if score < min_similarity:
+                    continue
+                for fighter_id in self._ids_with_token(tokens, token):
+                    if score > best.get(fighter_id, 0.0) and \
+                            token in self._normalized[fighter_id].split():
+                        best[fighter_id] = score
+            scores.update(best)
+        return [(fighter_id, self.names[fighter_id])
+                for fighter_id, _ in scores.most_common(limit)]
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, str]]:
+        """Gets prefix matches for the query, falling back to fuzzy matches if there are none"""
+        return self.prefix(query, limit) or self.fuzzy(query, limit)
+
+    def flush(self) -> None:
+        """Writes any names added since the last flush to the file"""
+        with self._lock:
+            if self._log is not None:
+                self._log.flush()
+
+    def close(self) -> None:
+        """Flushes and closes the file"""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
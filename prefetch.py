@@ -0,0 +1,144 @@
+"""
+    Prefetch Module
+
+    This module speculatively loads the recent opponents of the fighter being viewed.
+    In the interactive menus the next fighter picked with 'cf' or 'cmp' is often one of
+    them, so fetching and parsing them in the background makes that pick instant.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from fetcher import PageFetcher
+from fighter import FighterData
+from instrumentation import METRICS
+
+
+class OpponentPrefetcher:
+    """
+        Loads a fighter's most recent opponents in the background into a bounded cache.
+
+        Attributes:
+            fetcher (PageFetcher): The fetcher shared with the foreground, so the rate
+                limiter and page cache apply to prefetches as well.
+            opponents (int): How many of the most recent opponents are prefetched.
+            capacity (int): The most prefetched fighters kept, least recently added dropped.
+            max_requests (int): The budget of page requests prefetching may make in total.
+            requests (int): The page requests made so far.
+
+        Work no longer needed is cancelled whenever a new fighter is prefetched for, and all
+        work is cancelled when the fighter asked for was not prefetched, so speculative
+        requests never delay the foreground for long.
+    """
+
+    def __init__(self, fetcher: PageFetcher, opponents: int = 3, capacity: int = 8,
+                 max_requests: int = 60, max_workers: int = 2) -> None:
+        """Initializes the prefetcher with a small background worker pool"""
+        self.fetcher = fetcher
+        self.opponents = opponents
+        self.capacity = capacity
+        self.max_requests = max_requests
+        self.requests = 0
+        self._fighters: 'OrderedDict[str, FighterData]' = OrderedDict()
+        self._jobs: Dict[str, Tuple[Future, threading.Event]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='prefetch')
+
+    def _spend(self, cancelled: threading.Event) -> bool:
+        """Takes one request from the budget, unless it is spent or work was cancelled"""
+        with self._lock:
+            if cancelled.is_set() or self.requests >= self.max_requests:
+                return False
+            self.requests += 1
+        METRICS.count('prefetch.requests')
+        return True
+
+    def _load(self, fighter_id: str, cancelled: threading.Event) -> Optional[FighterData]:
+        """Fetches and parses both pages of a fighter, stopping early if cancelled"""
+        fighter = FighterData(fetcher=self.fetcher, parse_only=True)
+        fighter.set_url_from_id(fighter_id)
+        for fetch in (fighter.fetch_history, fighter.fetch_stats):
+            if not self._spend(cancelled):
+                return None
+            fetch()
+        with METRICS.timer('prefetch.parse'):
+            fighter.get_fight_history()
+            fighter.get_soup()
+        with self._lock:
+            self._fighters[fighter_id] = fighter
+            self._fighters.move_to_end(fighter_id)
+            while len(self._fighters) > self.capacity:
+                self._fighters.popitem(last=False)[1].release()
+        return fighter
+
+    def _finished(self, fighter_id: str, future: Future) -> None:
+        """Forgets a finished job, dropping its error since prefetching is best effort"""
+        with self._lock:
+            if fighter_id in self._jobs and self._jobs[fighter_id][0] is future:
+                del self._jobs[fighter_id]
+        if not future.cancelled() and future.exception() is not None:
+            METRICS.count('prefetch.errors')
+
+    def prefetch(self, fighter) -> List[str]:
+        """
+            Starts loading the fighter's most recent opponents, cancelling outstanding work
+            for any other fighter. Returns the ids that were queued.
+        """
+        queued = []
+        for opponent_id in fighter.get_opponent_ids():
+            if len(queued) == self.opponents:
+                break
+            if opponent_id is None or opponent_id == fighter.fighter_id \
+                    or opponent_id in queued:
+                continue
+            queued.append(opponent_id)
+        self.cancel(keep=queued)
+        with self._lock:
+            for opponent_id in queued:
+                if opponent_id in self._fighters or opponent_id in self._jobs:
+                    continue
+                cancelled = threading.Event()
+                future = self._executor.submit(self._load, opponent_id, cancelled)
+                self._jobs[opponent_id] = (future, cancelled)
+                future.add_done_callback(
+                    lambda done, opponent_id=opponent_id: self._finished(opponent_id, done))
+        return queued
+
+    def take(self, fighter_id: str) -> Optional[FighterData]:
+        """
+            Gets a prefetched fighter, waiting for it if it is still loading.
+            On a miss the outstanding work is cancelled to free up the connection.
+        """
+        with self._lock:
+            fighter = self._fighters.pop(fighter_id, None)
+            job, _ = self._jobs.get(fighter_id, (None, None))
+        if fighter is None and job is not None and not job.cancel():
+            try:  # Already running, so waiting beats starting the same requests over
+                fighter = job.result()
+            except Exception:  # pylint: disable=broad-except
+                fighter = None
+            with self._lock:
+                self._fighters.pop(fighter_id, None)
+        if fighter is None:
+            METRICS.count('prefetch.misses')
+            self.cancel()
+        else:
+            METRICS.count('prefetch.hits')
+        return fighter
+
+    def cancel(self, keep: Iterable[str] = ()) -> None:
+        """Cancels queued jobs and stops running ones before their next request"""
+        keep = set(keep)
+        with self._lock:
+            dropped = [fighter_id for fighter_id in self._jobs if fighter_id not in keep]
+            jobs = [self._jobs.pop(fighter_id) for fighter_id in dropped]
+        for future, cancelled in jobs:
+            cancelled.set()
+            future.cancel()
+
+    def close(self) -> None:
+        """Cancels outstanding work and shuts down the worker pool"""
+        self.cancel()
+        self._executor.shutdown(wait=False)
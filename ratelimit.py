@@ -0,0 +1,174 @@
+"""
+    Rate Limit Module
+
+    This module paces requests to each host and decides how failed requests are retried.
+    The per-host token buckets slow down when the server answers 429 and speed back up
+    while requests succeed, so a crawl runs as fast as the upstream allows.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class FetchError(Exception):
+    """
+        Raised when a page could not be downloaded.
+
+        Attributes:
+            url (str): The URL that was requested.
+            status (int): The last HTTP status received, or None if no response arrived.
+            attempts (int): The number of attempts made.
+    """
+
+    def __init__(self, url: str, status: Optional[int], attempts: int,
+                 reason: str) -> None:
+        """Initializes the error with a readable message"""
+        super().__init__(f"GET {url} failed after {attempts} attempt(s): {reason}")
+        self.url = url
+        self.status = status
+        self.attempts = attempts
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given either in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+        A thread-safe token bucket whose refill rate can change while it is used.
+
+        Attributes:
+            rate (float): The number of tokens added per second.
+            capacity (float): The most tokens the bucket holds, which bounds bursts.
+            tokens (float): The tokens currently available.
+            blocked_until (float): The time before which no token is handed out.
+            throttled_at (float): The last time the rate was cut.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Initializes a full bucket"""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.blocked_until = 0.0
+        self.throttled_at = 0.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a token is available and takes it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter:
+    """
+        Paces requests per host, halving a host's rate when it answers 429 and
+        raising it again a little after every successful request.
+
+        Attributes:
+            initial_rate (float): The requests per second a new host starts at.
+            min_rate (float): The slowest the limiter will go.
+            max_rate (float): The fastest the limiter will go.
+            burst (float): The number of requests that may be sent back to back.
+            increase (float): The requests per second added after each success.
+            decrease (float): The factor the rate is multiplied by after a 429.
+    """
+
+    def __init__(self, initial_rate: float = 5.0, min_rate: float = 0.5,
+                 max_rate: float = 50.0, burst: float = 10.0, increase: float = 0.25,
+                 decrease: float = 0.5) -> None:
+        """Initializes the limiter with the rate bounds every host uses"""
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        """Gets the token bucket of the host a URL points to"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.initial_rate, self.burst)
+            return self._buckets[host]
+
+    def acquire(self, url: str) -> None:
+        """Blocks until a request to the URL's host may be sent"""
+        self.bucket(url).acquire()
+
+    def on_success(self, url: str) -> None:
+        """Raises the host's rate after a successful request"""
+        bucket = self.bucket(url)
+        with bucket.lock:
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    def on_throttle(self, url: str, retry_after: Optional[float] = None) -> None:
+        """
+            Cuts the host's rate after a 429, pausing it for Retry-After seconds if given.
+            The rate is cut at most once per second so a burst of 429s from requests that
+            were already in flight only counts once.
+        """
+        bucket = self.bucket(url)
+        with bucket.lock:
+            now = time.monotonic()
+            if now - bucket.throttled_at >= 1.0:
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                bucket.throttled_at = now
+            bucket.tokens = min(bucket.tokens, 0.0)
+            if retry_after is not None:
+                bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+
+
+class RetryPolicy:
+    """
+        Bounded exponential backoff with full jitter.
+
+        Attributes:
+            max_attempts (int): The number of attempts made before giving up.
+            base_delay (float): The backoff ceiling in seconds after the first failure.
+            max_delay (float): The largest backoff ceiling in seconds.
+    """
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5,
+                 max_delay: float = 30.0) -> None:
+        """Initializes the retry policy"""
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Gets how long to wait after the given failed attempt, starting at 1"""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        backoff = random.uniform(0, ceiling)
+        if retry_after is not None:
+            return max(backoff, min(retry_after, self.max_delay))
+        return backoff
@@ -0,0 +1,173 @@
+"""
+    Reparse Module
+
+    This module re-derives fighter data from saved pages without touching the network.
+    Pages named `<fighter id>.stats.html` and `<fighter id>.history.html` are read from a
+    directory, a zip file or a (compressed) tar file, parsed and extracted across a pool
+    of processes, and only the compact extracted records are sent back, in input order.
+"""
+
+import os
+import re
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from compact import CompactFighter
+from fighter import FighterData
+
+PAGE_PATTERN = re.compile(r'(?:^|/)(\d+)\.(stats|history)\.html$')
+# A stats page missing from the archive is parsed as an empty document, never fetched
+MISSING_PAGE = b'<html></html>'
+
+PageSet = Tuple[str, Dict[str, bytes]]
+
+
+def _page_names(names: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """Groups archive member names by fighter id and page, ignoring other files"""
+    fighters: Dict[str, Dict[str, str]] = {}
+    for name in names:
+        match = PAGE_PATTERN.search(name.replace(os.sep, '/'))
+        if match:
+            fighters.setdefault(match.group(1), {})[match.group(2)] = name
+    return fighters
+
+
+def _sorted_ids(fighters: Dict[str, Dict[str, str]]) -> List[str]:
+    """Gets the fighter ids in numeric order"""
+    return sorted(fighters, key=int)
+
+
+def iter_directory(path: str) -> Iterator[PageSet]:
+    """Reads the pages of each fighter in a directory, in fighter id order"""
+    fighters = _page_names(os.listdir(path))
+    for fighter_id in _sorted_ids(fighters):
+        pages = {}
+        for page, name in fighters[fighter_id].items():
+            with open(os.path.join(path, name), 'rb') as page_file:
+                pages[page] = page_file.read()
+        yield fighter_id, pages
+
+
+def iter_zip(path: str) -> Iterator[PageSet]:
+    """Reads the pages of each fighter in a zip file, in fighter id order"""
+    with zipfile.ZipFile(path) as archive:
+        fighters = _page_names(archive.namelist())
+        for fighter_id in _sorted_ids(fighters):
+            yield fighter_id, {page: archive.read(name)
+                               for page, name in fighters[fighter_id].items()}
+
+
+def iter_tar(path: str) -> Iterator[PageSet]:
+    """
+        Streams the pages of each fighter in a tar file, in archive order.
+        A fighter is yielded as soon as both of its pages have been read, so memory stays
+        bounded when the two pages of a fighter are stored near each other.
+    """
+    pending: Dict[str, Dict[str, bytes]] = {}
+    with tarfile.open(path, 'r|*') as archive:
+        for member in archive:
+            match = PAGE_PATTERN.search(member.name) if member.isfile() else None
+            if not match:
+                continue
+            fighter_id, page = match.groups()
+            pages = pending.setdefault(fighter_id, {})
+            pages[page] = archive.extractfile(member).read()
+            if len(pages) == 2:
+                yield fighter_id, pending.pop(fighter_id)
+    for fighter_id in _sorted_ids(pending):
+        yield fighter_id, pending[fighter_id]
+
+
+def iter_archive(path: str) -> Iterator[PageSet]:
+    """Reads the saved pages of each fighter from a directory, zip file or tar file"""
+    if os.path.isdir(path):
+        return iter_directory(path)
+    if zipfile.is_zipfile(path):
+        return iter_zip(path)
+    if tarfile.is_tarfile(path):
+        return iter_tar(path)
+    raise ValueError(f"{path} is not a directory, zip file or tar file")
+
+
+def reparse_pages(page_sets: List[PageSet],
+                  parse_only: bool) -> List[Tuple[str, Optional[CompactFighter], Optional[str]]]:
+    """
+        Parses and extracts each fighter of a chunk, in a worker process.
+        Returns (fighter id, compact fighter, None) or (fighter id, None, error) for each.
+    """
+    results = []
+    for fighter_id, pages in page_sets:
+        if 'history' not in pages:  # The name and record are read from the history page
+            results.append((fighter_id, None, "history page is missing from the archive"))
+            continue
+        fighter = FighterData(parse_only=parse_only)
+        fighter.set_url_from_id(fighter_id)
+        fighter.stats_resource = pages.get('stats', MISSING_PAGE)
+        fighter.history_resource = pages['history']
+        try:
+            results.append((fighter_id, fighter.compact(), None))
+        except Exception as error:  # pylint: disable=broad-except
+            results.append((fighter_id, None, f"{type(error).__name__}: {error}"))
+    return results
+
+
+class ArchiveReparser:
+    """
+        Re-parses an archive of saved pages across a pool of processes.
+
+        Attributes:
+            max_workers (int): The number of worker processes.
+            chunk_size (int): The number of fighters sent to a worker at a time.
+            parse_only (bool): Whether pages are parsed into just the subtrees the getters read.
+            errors (dict): The error message of each fighter id that failed to parse.
+            pages (tuple): The pages each fighter is extracted from, as on a FighterBatch.
+
+        At most two chunks per worker are in flight, and results are yielded in the order
+        the archive is read, so memory stays flat however large the archive is.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 8,
+                 parse_only: bool = True) -> None:
+        """Initializes a reparser, using one worker per CPU by default"""
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.parse_only = parse_only
+        self.errors: Dict[str, str] = {}
+        self.pages = ('stats', 'history')
+
+    def _chunks(self, page_sets: Iterator[PageSet]) -> Iterator[List[PageSet]]:
+        """Groups the fighters of an archive into chunks"""
+        chunk = []
+        for page_set in page_sets:
+            chunk.append(page_set)
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _collect(self, future: Future) -> Iterator[CompactFighter]:
+        """Yields the fighters of a finished chunk, recording the ones that failed"""
+        for fighter_id, fighter, error in future.result():
+            if error is not None:
+                self.errors[fighter_id] = error
+            else:
+                yield fighter
+
+    def reparse(self, path: str) -> Iterator[CompactFighter]:
+        """Re-parses every fighter in a directory, zip file or tar file, in archive order"""
+        max_in_flight = self.max_workers * 2
+        in_flight: Deque[Future] = deque()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                for chunk in self._chunks(iter_archive(path)):
+                    in_flight.append(executor.submit(reparse_pages, chunk, self.parse_only))
+                    if len(in_flight) >= max_in_flight:
+                        yield from self._collect(in_flight.popleft())
+                while in_flight:
+                    yield from self._collect(in_flight.popleft())
+            finally:
+                for future in in_flight:
+                    future.cancel()  # The caller stopped early
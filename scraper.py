@@ -3,13 +3,25 @@
 
     This module runs a script that takes in inputs for which fighter the user wants stats for.
     The user can also choose which type of statistics they'd like.
+    Passing --ids, --crawl or --reparse runs the scraper headless, streaming NDJSON or CSV
+    instead of prompting.
 """
 
+import argparse
+import math
+import os
 import re
-import gc
-import pandas as pd
-from tabulate import tabulate
+import sys
+import threading
+from cache import ResponseCache
+from fetcher import PageFetcher
 from fighter import FighterData
+from prefetch import OpponentPrefetcher
+from instrumentation import METRICS, enable as enable_metrics, timed
+from name_index import NameIndex, normalize
+from ratelimit import FetchError
+from headless import TABLES, WRITERS, create_batch, read_ids, run_headless
+from table import render_table
 
 # Glossary texts
 STRIKING_GLOSSARY = """
@@ -63,32 +75,58 @@ Glossary for Ground:
 
 def get_fighter_input():
     """Takes in the fighter ID"""
-    user_input = input("Please enter a fighter id or their ESPN URL: ")
+    user_input = input("Please enter a fighter id, name or their ESPN URL: ")
     return user_input
 
 
 def get_new_fighter():
     """Takes in new fighter ID"""
     user_input = input(
-        "Please enter fighter id or their ESPN URL (Type 'b' to go back): ")
+        "Please enter fighter id, name or their ESPN URL (Type 'b' to go back): ")
     return user_input
 
 
-def create_fighter_instance(user_input):
-    """Creates an instance of a fighter"""
-    fighter = FighterData()
+def resolve_fighter_name(user_input, name_index):
+    """Looks up a fighter id by name in the local index, asking which one if several match"""
+    matches = name_index.search(user_input)
+    exact = [match for match in matches if normalize(match[1]) == normalize(user_input)]
+    if len(exact) == 1 or len(matches) == 1:
+        return (exact or matches)[0][0]
+    if not matches:
+        return None
+    for number, (fighter_id, name) in enumerate(matches, start=1):
+        print(f"{number}. {name} ({fighter_id})")
+    choice = input("Choose a number (Press enter to cancel): ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(matches):
+        return matches[int(choice) - 1][0]
+    return None
+
+
+def create_fighter_instance(user_input, fetcher=None, prefetcher=None, name_index=None):
+    """
+        Creates an instance of a fighter from an id, ESPN URL or, given a name index, a name.
+        The fighter is taken from the prefetcher if it was prefetched.
+    """
+    fighter = FighterData(fetcher=fetcher, parse_only=True)
     if re.match(r'^\d+$', user_input):
         fighter.set_url_from_id(user_input)
     elif re.match(r'^(https?://(www.)?)?espn\.com/mma/fighter/_/id/\d+(/[\w-]+)?$', user_input):
         fighter.set_url_from_page(user_input)
+    elif name_index is not None and user_input.strip():
+        fighter_id = resolve_fighter_name(user_input, name_index)
+        if fighter_id is None:
+            print("No known fighter matches that name. Please enter a fighter id or an ESPN URL.")
+            return None
+        fighter.set_url_from_id(fighter_id)
     else:
-        print("Invalid input. Please enter a fighter id or an ESPN URL.")
+        print("Invalid input. Please enter a fighter id, a known name or an ESPN URL.")
         return None
-    fighter.set_resource()
-    fighter.set_soup()
+    if prefetcher is not None:
+        return prefetcher.take(fighter.fighter_id) or fighter
     return fighter
 
 
+@timed('print_fighter_info')
 def print_fighter_info(fighter):
     """Prints the basic fighter information"""
     opponents = fighter.get_opponents()
@@ -103,76 +141,39 @@ def print_fighter_info(fighter):
     print(f"Record: {records[0]}")
     print(f"TKO/KO: {records[1]}")
     print(f"Submissions: {records[2]}\n")
-    fight_history_df = pd.DataFrame({
-        "Opponent": opponents,
-        "Result": results,
-        "Method": methods,
-        "Round": end_round,
-        "Time": time,
-        "Event": event
-    })
-    print(
-        tabulate(
-            fight_history_df,
-            showindex=False,
-            headers=fight_history_df.columns))
+    print(render_table(list(zip(opponents, results, methods, end_round, time, event)),
+                       ["Opponent", "Result", "Method", "Round", "Time", "Event"]))
 
 
+@timed('print_stat_type')
 def print_stat_type(fighter, stat_type):
     """Takes in an input of which type of statistic they'd like and prints it."""
     if stat_type.lower() == "s":
         striking_headings, striking_stats = fighter.get_striking()
-        striking_df = pd.DataFrame(striking_stats, columns=striking_headings)
         print("\n")
         print("Table of All Striking Stats")
-        print(
-            tabulate(
-                striking_df,
-                showindex=False,
-                headers=striking_headings))
+        print(render_table(striking_stats, striking_headings))
         print("\n")
-        avg_striking_df = pd.DataFrame(fighter.find_column_avg(striking_stats),
-                                       index=striking_headings).T
         print("Average Striking Stats")
-        print(
-            tabulate(
-                avg_striking_df,
-                showindex=False,
-                headers=striking_headings))
+        print(render_table([fighter.find_column_avg(striking_stats)], striking_headings))
         print("\n")
     elif stat_type.lower() == "c":
         clinch_headings, clinch_stats = fighter.get_clinch()
-        clinch_df = pd.DataFrame(clinch_stats, columns=clinch_headings)
         print("\n")
         print("Table of All Clinch Stats")
-        print(tabulate(clinch_df, showindex=False, headers=clinch_headings))
+        print(render_table(clinch_stats, clinch_headings))
         print("\n")
-        avg_clinch_df = pd.DataFrame(
-            fighter.find_column_avg(clinch_stats),
-            index=clinch_headings).T
         print("Average Clinch Stats")
-        print(
-            tabulate(
-                avg_clinch_df,
-                showindex=False,
-                headers=clinch_headings))
+        print(render_table([fighter.find_column_avg(clinch_stats)], clinch_headings))
         print("\n")
     elif stat_type.lower() == "g":
         ground_headings, ground_stats = fighter.get_ground()
-        ground_df = pd.DataFrame(ground_stats, columns=ground_headings)
         print("\n")
         print("Table of All Ground Stats")
-        print(tabulate(ground_df, showindex=False, headers=ground_headings))
+        print(render_table(ground_stats, ground_headings))
         print("\n")
-        avg_ground_df = pd.DataFrame(
-            fighter.find_column_avg(ground_stats),
-            index=ground_headings).T
         print("Average Ground Stats")
-        print(
-            tabulate(
-                avg_ground_df,
-                showindex=False,
-                headers=ground_headings))
+        print(render_table([fighter.find_column_avg(ground_stats)], ground_headings))
         print("\n")
     elif stat_type.lower() == "gl":
         glossary_type = input(
@@ -201,44 +202,236 @@ def print_stat_type(fighter, stat_type):
                 "Invalid glossary type. Please choose 'striking', 'clinch', or 'ground'.")
 
 
+@timed('compare_fighters')
 def compare_fighters(fighter, second_fighter):
     """Compares two fighters and outputs a table comparing their statistics"""
-    stats_types = ['striking', 'ground', 'clinch']
-    comparisons = {}
-
-    for stat_type in stats_types:
-        fighter_stats = getattr(fighter, f'get_{stat_type}')()
-        second_fighter_stats = getattr(second_fighter, f'get_{stat_type}')()
-        avg_fighter_stats = pd.DataFrame(
-            second_fighter.find_column_avg(
-                fighter_stats[1]),
-            index=fighter_stats[0])
-        avg_second_fighter_stats = pd.DataFrame(
-            fighter.find_column_avg(
-                second_fighter_stats[1]),
-            index=second_fighter_stats[0])
-        comparison = avg_fighter_stats.compare(
-            avg_second_fighter_stats,
-            result_names=(
-                fighter.get_name(),
-                second_fighter.get_name()
-            )).droplevel(
-            0,
-            axis=1)
-        comparisons[stat_type] = comparison
-
-    for stat_type, comparison in comparisons.items():
+    from leaderboard import FighterComparison  # Deferred, it loads numpy
+    comparison = FighterComparison([fighter, second_fighter])
+    for stat_type in ['striking', 'ground', 'clinch']:
+        headings, averages = comparison.stat_table(stat_type)
+        rows = []
+        for heading, averages_row in zip(headings, averages.T.tolist()):
+            # A column without numeric values averages to 0, as find_column_avg gives
+            first, second = [0.0 if math.isnan(value) else value for value in averages_row]
+            if first != second:
+                rows.append([heading, first, second])
         print(f"\n{stat_type.capitalize()} Stats Comparison:")
-        print(tabulate(comparison, headers='keys', tablefmt='psql'))
+        print(render_table(rows, [''] + comparison.names, style='psql'))
+
+
+def parse_args(argv=None):
+    """Parses the command line options of the headless mode"""
+    parser = argparse.ArgumentParser(
+        description="Scrape ESPN MMA fighter data. Runs interactively without "
+                    "--ids, --crawl, --reparse, --refresh or --queue.")
+    parser.add_argument('--ids', help="file of fighter ids or ESPN URLs, '-' for stdin")
+    parser.add_argument('--tables', default='record,history',
+                        help=f"comma separated tables to output: {', '.join(TABLES)}")
+    parser.add_argument('--format', default='ndjson', choices=sorted(WRITERS),
+                        dest='output_format', help="output format")
+    parser.add_argument('--output', help="file to write to instead of stdout")
+    parser.add_argument('--workers', type=int,
+                        help="number of pages downloaded at the same time (default 8), "
+                             "or of processes with --reparse (default one per CPU)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="always download pages instead of using the page cache")
+    parser.add_argument('--db', help="SQLite database to sync the fighters into")
+    parser.add_argument('--refresh', action='store_true',
+                        help="re-scrape only the --ids (or stored) fighters that changed")
+    parser.add_argument('--crawl', metavar='SEEDS',
+                        help="comma separated seed ids to crawl the opponent graph from")
+    parser.add_argument('--depth', type=int,
+                        help="how many opponent hops the crawl goes from the seeds (default 1)")
+    parser.add_argument('--limit', type=int,
+                        help="stop the crawl or --work after this many fighters")
+    parser.add_argument('--checkpoint',
+                        help="crawl checkpoint file, resumed from if it already exists")
+    parser.add_argument('--prefetch', type=int, default=0, metavar='N',
+                        help="interactively, load the N most recent opponents of the shown "
+                             "fighter in the background")
+    parser.add_argument('--reparse', metavar='PATH',
+                        help="re-parse saved <id>.stats.html and <id>.history.html pages "
+                             "from a directory, zip or tar file instead of downloading")
+    parser.add_argument('--queue', metavar='PATH',
+                        help="shared SQLite work queue: queues the --ids, --range or --crawl "
+                             "seeds, or with --work claims fighters from it, else prints "
+                             "its progress")
+    parser.add_argument('--range', metavar='START-STOP',
+                        help="with --queue, queue every fighter id from START to STOP")
+    parser.add_argument('--work', action='store_true',
+                        help="with --queue, run as a worker until the queue is finished")
+    parser.add_argument('--wal', action='store_true',
+                        help="with --queue, use SQLite write-ahead logging, faster but only "
+                             "safe when every worker runs on the queue file's machine")
+    parser.add_argument('--lease', type=float, metavar='SECONDS',
+                        help="how long a worker's claim lasts without being renewed "
+                             "(default 120)")
+    parser.add_argument('--profile', action='store_true',
+                        help="print per-stage timings and counters to stderr on exit")
+    args = parser.parse_args(argv)
+    args.tables = [table.strip() for table in args.tables.split(',') if table.strip()]
+    unknown = set(args.tables) - set(TABLES)
+    if unknown:
+        parser.error(f"unknown tables: {', '.join(sorted(unknown))}")
+    if args.refresh and not args.db:
+        parser.error("--refresh requires --db")
+    if sum(bool(source) for source in (args.ids, args.crawl, args.reparse)) > 1:
+        parser.error("only one of --ids, --crawl and --reparse can be used")
+    if (args.range or args.work or args.wal) and not args.queue:
+        parser.error("--range, --work and --wal require --queue")
+    if args.queue and (args.reparse or args.refresh):
+        parser.error("--queue cannot be used with --reparse or --refresh")
+    if args.work and (args.ids or args.crawl or args.range):
+        parser.error("--work claims fighters from the queue, queue them in a separate run")
+    if args.range:
+        start, _, stop = args.range.partition('-')
+        if not (start.isdigit() and stop.isdigit() and int(start) < int(stop)):
+            parser.error("--range must be START-STOP with START below STOP")
+        args.range = (int(start), int(stop) + 1)
+    if args.workers is None and not args.reparse:
+        args.workers = 8
+    return args
+
+
+def create_crawler(args, batch):
+    """Creates an opponent crawl from the seeds, or resumes it from its checkpoint"""
+    from crawler import OpponentCrawler  # Deferred so the interactive mode starts faster
+    limits = {}
+    if args.depth is not None:
+        limits['max_depth'] = args.depth
+    if args.limit is not None:
+        limits['max_fighters'] = args.limit
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        return OpponentCrawler.resume(args.checkpoint, batch=batch, **limits)
+    seeds = [seed.strip() for seed in args.crawl.split(',') if seed.strip()]
+    return OpponentCrawler(seeds, checkpoint_path=args.checkpoint, batch=batch, **limits)
+
+
+def run_refresh(args):
+    """Syncs fighters into the database, re-scraping only the ones that changed"""
+    from batch import FighterBatch  # Deferred so the interactive mode starts faster
+    from database import FighterDatabase
+    database = FighterDatabase(args.db)
+    fighter_ids = read_ids(args.ids) if args.ids else database.fighter_ids()
+    fetcher = PageFetcher(pool_size=args.workers,
+                          cache=None if args.no_cache else ResponseCache())
+    batch = FighterBatch(max_workers=args.workers, fetcher=fetcher,
+                         pages=('history',), parse_only=True)
+    updated = database.refresh(fighter_ids, batch)
+    database.close()
+    print(f"Updated {len(updated)} fighters.", file=sys.stderr)
+    for fighter_id, error in batch.errors.items():
+        print(f"Fighter {fighter_id}: {error}", file=sys.stderr)
+    return 1 if batch.errors else 0
+
+
+def run_coordinator(args):
+    """Queues fighters in the work queue, then prints the queue's progress"""
+    from work_queue import WorkQueue  # Deferred so the interactive mode starts faster
+    queue = WorkQueue(args.queue, wal=args.wal)
+    queued = 0
+    if args.ids:
+        queued += queue.enqueue(read_ids(args.ids))
+    if args.range:
+        queued += queue.enqueue_range(*args.range)
+    if args.crawl:
+        seeds = [seed.strip() for seed in args.crawl.split(',') if seed.strip()]
+        queued += queue.enqueue(seeds, hops=1 if args.depth is None else args.depth)
+    if args.ids or args.range or args.crawl:
+        print(f"Queued {queued} new fighters.", file=sys.stderr)
+    counts = queue.counts()
+    print(', '.join(f"{count} {state}" for state, count in counts.items()), file=sys.stderr)
+    for fighter_id, error in queue.failures().items():
+        print(f"Fighter {fighter_id}: {error}", file=sys.stderr)
+    queue.close()
+    return 1 if counts['failed'] else 0
+
+
+def run_cli(args):
+    """Runs the scraper headless and returns the exit code"""
+    if args.refresh:
+        return run_refresh(args)
+    if args.queue and not args.work:
+        return run_coordinator(args)
+    output = open(args.output, 'w', encoding='utf-8', newline='') \
+        if args.output else sys.stdout
+    if args.reparse:
+        from reparse import ArchiveReparser  # Deferred, it loads numpy
+        batch = ArchiveReparser(max_workers=args.workers)
+        fighters = batch.reparse(args.reparse)
+    else:
+        batch = create_batch(args.tables, args.workers, use_cache=not args.no_cache)
+        if args.work:
+            from work_queue import DEFAULT_LEASE_SECONDS, QueueWorker, WorkQueue
+            worker = QueueWorker(WorkQueue(args.queue, wal=args.wal), batch,
+                                 lease_seconds=args.lease or DEFAULT_LEASE_SECONDS)
+            fighters = worker.run(args.limit)
+        elif args.crawl:
+            fighters = create_crawler(args, batch).crawl()
+        else:
+            fighters = batch.load(read_ids(args.ids))
+    try:
+        failures = run_headless(fighters, batch, args.tables, args.output_format,
+                                output, database_path=args.db, name_index=NameIndex())
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if failures else 0
 
 
-def main():
+def main(argv=None):
     """Main function which runs the script"""
+    args = parse_args(argv)
+    if args.profile:
+        enable_metrics()
+    try:
+        if args.ids or args.crawl or args.refresh or args.reparse or args.queue:
+            return run_cli(args)
+        return run_interactive(args.prefetch)
+    finally:
+        if args.profile:
+            print(METRICS.report(), file=sys.stderr)
+
+
+def show_fighter(fighter, prefetcher=None, name_index=None):
+    """
+        Prints the basic fighter information, records the names seen on the page and
+        prefetches the fighter's recent opponents
+    """
+    print_fighter_info(fighter)
+    if name_index is not None:
+        name_index.add_fighter(fighter)
+        name_index.flush()
+    if prefetcher is not None:
+        prefetcher.prefetch(fighter)
+
+
+def run_interactive(prefetch=0):
+    """Runs the interactive menus, prefetching that many recent opponents if not zero"""
+    fetcher = PageFetcher(cache=ResponseCache())
+    prefetcher = OpponentPrefetcher(fetcher, opponents=prefetch) if prefetch > 0 else None
+    name_index = NameIndex()
+    # Builds the search indexes while the user types, so the first lookup is instant
+    threading.Thread(target=name_index.warm, daemon=True).start()
+    try:
+        run_menus(fetcher, prefetcher, name_index)
+    finally:
+        if prefetcher is not None:
+            prefetcher.close()
+        name_index.close()
+
+
+def run_menus(fetcher, prefetcher=None, name_index=None):
+    """Runs the interactive menu loop"""
     user_input = get_fighter_input()
-    fighter = create_fighter_instance(user_input)
+    fighter = create_fighter_instance(user_input, fetcher, prefetcher, name_index)
     if fighter is None:
         return
-    print_fighter_info(fighter)
+    try:
+        show_fighter(fighter, prefetcher, name_index)
+    except FetchError as error:
+        print(f"Could not load the fighter: {error}")
+        return
     while True:
         stat_type = input(
             "Choose an option: \n"
@@ -256,23 +449,41 @@ def main():
             break
         if stat_type.lower() == "cf":
             new_input = get_new_fighter()
-            if new_input.lower() != "b":
-                del fighter
-                gc.collect()
-                fighter = create_fighter_instance(new_input)
-                print_fighter_info(fighter)
+            if new_input.lower() == "b":
+                continue
+            # The current fighter is kept until the new one has loaded
+            new_fighter = create_fighter_instance(new_input, fetcher, prefetcher, name_index)
+            if new_fighter is None:
+                continue
+            try:
+                show_fighter(new_fighter, prefetcher, name_index)
+            except FetchError as error:
+                print(f"Could not load the fighter: {error}")
+                continue
+            fighter.release()
+            fighter = new_fighter
         elif stat_type.lower() == "cmp":
             compared_fighter = get_fighter_input()
-            second_fighter = create_fighter_instance(compared_fighter)
+            second_fighter = create_fighter_instance(compared_fighter, fetcher, prefetcher,
+                                                     name_index)
             if second_fighter is None:
-                return
-            compare_fighters(fighter, second_fighter)
+                continue
+            try:
+                compare_fighters(fighter, second_fighter)
+            except FetchError as error:
+                print(f"Could not load the fighters to compare: {error}")
+                continue
+            if name_index is not None:
+                name_index.add_fighter(second_fighter)
         elif stat_type.lower() not in ["s", "c", "g", "gl"]:
             print(
                 "Invalid input. Please choose a valid stat type, 'glossary', or 'exit'.")
         else:
-            print_stat_type(fighter, stat_type)
+            try:
+                print_stat_type(fighter, stat_type)
+            except FetchError as error:
+                print(f"Could not load the stats page: {error}")
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+    Stat Matrix Module
+
+    This module turns a fighter's statistics table into typed float arrays.
+    Cells are parsed once, after which averages, sums and ratios are vectorized reductions.
+"""
+
+from typing import List
+import numpy as np
+
+
+class StatMatrix:
+    """
+        A statistics table stored as float arrays with one row per fight.
+
+        Attributes:
+            headings (list): The name of each column.
+            landed (numpy.ndarray): The value of each cell, or the landed half of a
+                "landed/attempted" cell. Missing ('-') cells are NaN.
+            attempted (numpy.ndarray): The attempted half of each "landed/attempted" cell,
+                NaN for every other cell.
+    """
+
+    __slots__ = ('headings', 'landed', 'attempted')
+
+    def __init__(self, headings: List[str], landed: np.ndarray,
+                 attempted: np.ndarray) -> None:
+        """Initializes a stat matrix from already parsed arrays"""
+        self.headings = headings
+        self.landed = landed
+        self.attempted = attempted
+
+    @classmethod
+    def from_table(cls, headings: List[str], stats: List[List[str]]) -> 'StatMatrix':
+        """
+            Parses a table of stat strings such as '12/30', '45%', '7' and '-'.
+            Rows shorter than the headings are padded with missing cells.
+        """
+        if not stats:
+            empty = np.full((0, len(headings)), np.nan)
+            return cls(headings, empty, empty.copy())
+        width = len(headings)
+        if any(len(row) != width for row in stats):
+            stats = [list(row[:width]) + ['-'] * (width - len(row)) for row in stats]
+        cells = np.asarray(stats, dtype=np.str_)
+        parts = np.char.partition(cells, '/')
+        landed_text = np.char.strip(parts[..., 0], '%')
+        attempted_text = parts[..., 2]
+        missing = (cells == '-') | (landed_text == '')
+        landed = np.where(missing, 'nan', landed_text).astype(np.float64)
+        has_attempts = (parts[..., 1] == '/') & (attempted_text != '')
+        attempted = np.where(has_attempts, attempted_text, 'nan').astype(np.float64)
+        return cls(headings, landed, attempted)
+
+    @property
+    def fights(self) -> int:
+        """Gets the number of fights in the table"""
+        return self.landed.shape[0]
+
+    def counts(self) -> np.ndarray:
+        """Gets the number of non-missing cells in each column"""
+        return np.count_nonzero(~np.isnan(self.landed), axis=0)
+
+    def sum(self) -> np.ndarray:
+        """Gets the sum of each column, ignoring missing cells"""
+        return np.nansum(self.landed, axis=0)
+
+    def attempted_sum(self) -> np.ndarray:
+        """Gets the sum of the attempted half of each "landed/attempted" column"""
+        return np.nansum(self.attempted, axis=0)
+
+    def mean(self, empty: float = 0.0) -> np.ndarray:
+        """Gets the average of each column over its non-missing cells, `empty` if it has none"""
+        counts = self.counts()
+        return np.divide(self.sum(), counts, out=np.full(len(self.headings), empty),
+                         where=counts != 0)
+
+    def accuracy(self) -> np.ndarray:
+        """
+            Gets landed divided by attempted for each "landed/attempted" column, using only
+            the fights where both halves are known. Other columns are NaN.
+        """
+        both = ~np.isnan(self.attempted) & ~np.isnan(self.landed)
+        landed = np.where(both, self.landed, 0.0).sum(axis=0)
+        attempted = np.where(both, self.attempted, 0.0).sum(axis=0)
+        return np.divide(landed, attempted, out=np.full(len(self.headings), np.nan),
+                         where=attempted != 0)
+
+    def per_fight(self) -> np.ndarray:
+        """Gets the sum of each column divided by the number of fights in the table"""
+        if self.fights == 0:
+            return np.zeros(len(self.headings))
+        return self.sum() / self.fights
@@ -0,0 +1,135 @@
+"""
+    Stat Tables Module
+
+    This module extracts every stats table of a fighter's stats page in a single pass.
+    Headings are mapped to columns by name, so the per-fight key columns (date, opponent,
+    event and result) are kept next to each stat row and the rows can be joined back to
+    the bouts of the fight history.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from bs4 import BeautifulSoup, Tag
+from history import OPPONENT_ID_PATTERN, FightHistory
+
+STAT_TYPES = ['striking', 'clinch', 'ground']
+# The stats page columns identifying the fight, and the StatTable list each is stored in
+KEY_COLUMNS = {'Date': 'dates', 'Opp': 'opponents', 'Event': 'events', 'Res.': 'results'}
+HEADING_ROW_CLASS = ['Table__TR', 'Table__even']
+STAT_ROW_CLASS = ['Table__TR', 'Table__TR--sm', 'Table__even']
+
+
+class StatTable:
+    """
+        One stats table, with the key columns of each fight beside its stat values.
+
+        Attributes:
+            headings (list): The headings of the stat columns, without the key columns.
+            rows (list): The stat values of each fight, most recent fight first.
+            dates (list): The date of each fight.
+            opponents (list): The name of each opponent.
+            opponent_ids (list): The ESPN id of each opponent, or None if it has no link.
+            events (list): The event each fight took place at.
+            results (list): The result of each fight, either a W, L, D or NC.
+    """
+
+    __slots__ = ('headings', 'rows', 'dates', 'opponents', 'opponent_ids', 'events',
+                 'results', '_key_columns', '_stat_columns')
+
+    def __init__(self, headings: List[str]) -> None:
+        """Initializes an empty table, splitting the page's headings into key and stat columns"""
+        self._key_columns: List[Tuple[int, str]] = []
+        self._stat_columns: List[int] = []
+        self.headings: List[str] = []
+        for column, heading in enumerate(headings):
+            if heading in KEY_COLUMNS:
+                self._key_columns.append((column, KEY_COLUMNS[heading]))
+            else:
+                self._stat_columns.append(column)
+                self.headings.append(heading)
+        self.rows: List[List[str]] = []
+        self.dates: List[str] = []
+        self.opponents: List[str] = []
+        self.opponent_ids: List[Optional[str]] = []
+        self.events: List[str] = []
+        self.results: List[str] = []
+
+    def __len__(self) -> int:
+        """Gets the number of fights in the table"""
+        return len(self.rows)
+
+    def add_row(self, row: Tag) -> None:
+        """Splits the cells of a table row into its key columns and stat values"""
+        cells = row.find_all('td')
+        keys = {name: '' for name in KEY_COLUMNS.values()}
+        anchor = None
+        for column, name in self._key_columns:
+            if column < len(cells):
+                keys[name] = cells[column].text
+                if name == 'opponents':
+                    anchor = cells[column].find('a')
+        opponent_id = None
+        if anchor is not None:
+            match = OPPONENT_ID_PATTERN.search(anchor.get('href', ''))
+            if match:
+                opponent_id = match.group(1)
+        self.rows.append([cells[column].text for column in self._stat_columns
+                          if column < len(cells)])
+        self.dates.append(keys['dates'])
+        self.opponents.append(keys['opponents'])
+        self.opponent_ids.append(opponent_id)
+        self.events.append(keys['events'])
+        self.results.append(keys['results'])
+
+    def bout_indexes(self, history: FightHistory) -> List[Optional[int]]:
+        """
+            Gets the index in the fight history of the bout each row is from, matched by
+            date and opponent id, or date and opponent name for unlinked opponents.
+            Rows whose bout is not in the history get None.
+        """
+        bouts: Dict[Tuple[str, str], int] = {}
+        for index in range(len(history) - 1, -1, -1):  # The most recent match wins
+            date = history.dates[index]
+            if history.opponent_ids[index] is not None:
+                bouts[date, history.opponent_ids[index]] = index
+            bouts[date, ' '.join(history.opponents[index].split())] = index
+        indexes = []
+        for date, opponent, opponent_id in zip(self.dates, self.opponents, self.opponent_ids):
+            index = bouts.get((date, opponent_id)) if opponent_id is not None else None
+            if index is None:
+                index = bouts.get((date, ' '.join(opponent.split())))
+            indexes.append(index)
+        return indexes
+
+
+def _is_table_part(tag: Tag) -> bool:
+    """Checks whether a tag is a heading row, a stats table body or a stat row"""
+    if tag.name == 'tr':
+        return tag.get('class') in (HEADING_ROW_CLASS, STAT_ROW_CLASS)
+    return tag.name == 'tbody' and 'Table__TBODY' in tag.get('class', ())
+
+
+def extract_stat_tables(soup: BeautifulSoup) -> Dict[str, StatTable]:
+    """
+        Extracts the striking, clinch and ground tables with one walk over the stats page.
+        The n-th heading row of the page heads the n-th table body, and tables missing
+        from the page are left out.
+    """
+    heading_rows: List[Tag] = []
+    bodies: List[Tag] = []
+    rows: Dict[int, List[Tag]] = {}
+    for tag in soup.find_all(_is_table_part):
+        if tag.name == 'tbody':
+            rows[id(tag)] = []
+            bodies.append(tag)
+        elif tag['class'] == HEADING_ROW_CLASS:
+            heading_rows.append(tag)
+        elif id(tag.parent) in rows:
+            rows[id(tag.parent)].append(tag)
+    tables = {}
+    for stat_type, heading_row, body in zip(STAT_TYPES, heading_rows, bodies):
+        table = StatTable([heading.text.strip()
+                           for heading in heading_row.find_all('th', {'class': 'Table__TH'})])
+        for row in rows[id(body)]:
+            table.add_row(row)
+        tables[stat_type] = table
+    return tables
@@ -0,0 +1,105 @@
+"""
+    Table Module
+
+    This module renders small column-aligned text tables straight from lists of rows.
+    The output matches tabulate's 'simple' and 'psql' formats for the values the scraper
+    prints, without importing pandas or tabulate or building a DataFrame per table.
+"""
+
+from typing import Any, List, Optional, Sequence
+
+STYLES = ['simple', 'psql']
+MIN_PADDING = 2
+
+
+def _value_type(value: Any) -> Optional[type]:
+    """Gets whether a cell holds an int, a float or text, or None if it is empty"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        return str
+    if isinstance(value, (int, float)):
+        return type(value) if type(value) in (int, float) else float
+    text = str(value).strip()
+    for number_type in (int, float):
+        try:
+            number_type(text)
+            return number_type
+        except ValueError:
+            pass
+    return str
+
+
+def _column_type(values: Sequence[Any]) -> type:
+    """Gets the most general type of a column, where text beats float beats int"""
+    types = {_value_type(value) for value in values}
+    for column_type in (str, float, int):
+        if column_type in types:
+            return column_type
+    return str
+
+
+def _format_cell(value: Any, column_type: type) -> str:
+    """Formats one cell the way the column's type is shown"""
+    if value is None or value == '':
+        return ''
+    if column_type is float:
+        return format(float(value), 'g')
+    return str(value).strip()
+
+
+def _after_point(text: str) -> int:
+    """Gets how many characters follow the decimal point of a number, or -1 if none"""
+    try:
+        int(text)
+        return -1
+    except ValueError:
+        pass
+    position = text.rfind('.')
+    if position < 0:
+        position = text.lower().rfind('e')
+    return len(text) - position - 1 if position >= 0 else -1
+
+
+def _line_up_points(cells: List[str]) -> List[str]:
+    """Pads numbers on the right so their decimal points line up once right-aligned"""
+    points = [_after_point(cell) if cell else -1 for cell in cells]
+    most = max(points, default=-1)
+    return [cell + ' ' * (most - point) if cell else cell
+            for cell, point in zip(cells, points)]
+
+
+def render_table(rows: Sequence[Sequence[Any]], headers: Sequence[Any],
+                 style: str = 'simple') -> str:
+    """
+        Renders rows under the headers as a text table.
+        The 'simple' style underlines the headers; 'psql' draws a box around the table.
+    """
+    if style not in STYLES:
+        raise ValueError(f"Unknown table style {style!r}, expected one of {STYLES}")
+    headers = [str(header) for header in headers]
+    columns = []
+    for index, header in enumerate(headers):
+        values = [row[index] if index < len(row) else None for row in rows]
+        column_type = _column_type(values)
+        cells = [_format_cell(value, column_type) for value in values]
+        if column_type is not str:
+            cells = _line_up_points(cells)
+        width = max([len(header) + MIN_PADDING] + [len(cell) for cell in cells])
+        justify = str.ljust if column_type is str else str.rjust
+        columns.append((width, justify(header, width),
+                        [justify(cell, width) for cell in cells]))
+    widths = [width for width, _, _ in columns]
+    lines = [[heading for _, heading, _ in columns]]
+    lines.extend([list(cells) for cells in zip(*[cells for _, _, cells in columns])])
+    if style == 'simple':
+        text = ['  '.join(lines[0]).rstrip(),
+                '  '.join('-' * width for width in widths)]
+        text.extend('  '.join(line).rstrip() for line in lines[1:])
+        return '\n'.join(text)
+    border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+    text = [border, '| ' + ' | '.join(lines[0]) + ' |',
+            '|' + border[1:-1] + '|']
+    text.extend('| ' + ' | '.join(line) + ' |' for line in lines[1:])
+    text.append(border)
+    return '\n'.join(text)
@@ -0,0 +1,300 @@
+"""
+    Work Queue Module
+
+    This module spreads a scrape over many worker processes, on one machine or several.
+    A coordinator puts fighter ids into a shared SQLite work queue, and each worker claims
+    a batch of ids under a time-limited lease, keeps renewing the lease while it loads them,
+    and reports every fighter as done or failed. The lease of a worker that crashes runs
+    out and its fighters are claimed by another worker. Workers can also queue the
+    opponents of the fighters they load, so an opponent crawl is shared between them.
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from batch import FighterBatch
+from fighter import FighterData
+
+DEFAULT_LEASE_SECONDS = 120.0
+DEFAULT_MAX_ATTEMPTS = 3
+STATES = ['pending', 'leased', 'done', 'failed']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    fighter_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'pending',
+    hops INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires);
+"""
+
+
+class WorkQueue:
+    """
+        A lease-based queue of fighter ids shared by workers through a SQLite file.
+
+        Attributes:
+            path (str): The path of the SQLite queue file.
+            max_attempts (int): How many times a fighter is claimed before it is marked
+                failed, counting claims whose lease ran out.
+            connection (sqlite3.Connection): The open connection to the queue.
+            wal (bool): Whether the queue uses write-ahead logging, which is faster but
+                only safe when every worker runs on the same machine as the queue file.
+
+        Each fighter is queued once. `hops` is how many more opponent hops may be queued
+        from it, so opponents of a fighter with 0 hops are not queued. Claims run in an
+        immediate transaction so two workers never lease the same fighter.
+    """
+
+    def __init__(self, path: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 wal: bool = False) -> None:
+        """
+            Opens the queue, creating it and its schema if needed. The default rollback
+            journal works over network filesystems; WAL needs shared memory on one host.
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.wal = wal
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None,
+                                          check_same_thread=False)
+        if wal:
+            self.connection.execute('PRAGMA journal_mode = WAL')
+            self.connection.execute('PRAGMA synchronous = NORMAL')
+        else:
+            self.connection.execute('PRAGMA journal_mode = DELETE')
+        self.connection.executescript(SCHEMA)
+        self._lock = threading.Lock()  # The lease renewal thread shares the connection
+
+    def close(self) -> None:
+        """Closes the connection to the queue"""
+        self.connection.close()
+
+    @contextmanager
+    def _immediate(self) -> Iterator[sqlite3.Connection]:
+        """Runs a block in one immediate transaction, which locks the queue for writing"""
+        with self._lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.connection
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+            self.connection.execute('COMMIT')
+
+    def enqueue(self, fighter_ids: Iterable, hops: int = 0) -> int:
+        """Queues fighter ids not queued before, returning how many were new"""
+        now = time.time()
+        with self._immediate() as connection:
+            return connection.executemany(
+                'INSERT OR IGNORE INTO jobs (fighter_id, hops, updated_at) VALUES (?, ?, ?)',
+                ((str(fighter_id), hops, now) for fighter_id in fighter_ids)).rowcount
+
+    def enqueue_range(self, start: int, stop: int, hops: int = 0) -> int:
+        """Queues every fighter id from start up to but not including stop"""
+        return self.enqueue(range(start, stop), hops)
+
+    def claim(self, worker: str, count: int,
+              lease_seconds: float = DEFAULT_LEASE_SECONDS) -> List[Tuple[str, int]]:
+        """
+            Leases up to `count` pending fighters, or fighters whose lease ran out, to the
+            worker. Returns their (fighter id, hops).
+        """
+        now = time.time()
+        with self._immediate() as connection:
+            # A fighter whose lease keeps running out is likely crashing its workers
+            connection.execute(
+                "UPDATE jobs SET state = 'failed', worker = NULL, updated_at = ?, "
+                "error = 'lease ran out ' || attempts || ' times' "
+                "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts))
+            rows = connection.execute(
+                "SELECT fighter_id, hops FROM jobs WHERE state = 'pending' "
+                "OR (state = 'leased' AND lease_expires < ?) LIMIT ?", (now, count)).fetchall()
+            connection.executemany(
+                "UPDATE jobs SET state = 'leased', worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE fighter_id = ?",
+                ((worker, now + lease_seconds, now, fighter_id) for fighter_id, _ in rows))
+        return rows
+
+    def renew(self, worker: str, fighter_ids: Iterable[str],
+              lease_seconds: float = DEFAULT_LEASE_SECONDS) -> int:
+        """Extends the leases the worker still holds, returning how many were extended"""
+        now = time.time()
+        with self._immediate() as connection:
+            return connection.executemany(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE fighter_id = ? AND state = 'leased' AND worker = ?",
+                ((now + lease_seconds, now, fighter_id, worker)
+                 for fighter_id in fighter_ids)).rowcount
+
+    def release(self, worker: str, fighter_ids: Iterable[str]) -> int:
+        """Hands back leases the worker will not finish, without counting them as attempts"""
+        now = time.time()
+        with self._immediate() as connection:
+            return connection.executemany(
+                "UPDATE jobs SET state = 'pending', worker = NULL, lease_expires = NULL, "
+                "attempts = attempts - 1, updated_at = ? "
+                "WHERE fighter_id = ? AND state = 'leased' AND worker = ?",
+                ((now, fighter_id, worker) for fighter_id in fighter_ids)).rowcount
+
+    def complete(self, worker: str, fighter_id: str,
+                 opponent_ids: Iterable[Optional[str]] = ()) -> None:
+        """
+            Marks a fighter done and queues its opponents one hop less, if it had hops left.
+            A fighter finished after its lease ran out still counts as done.
+        """
+        now = time.time()
+        with self._immediate() as connection:
+            row = connection.execute(
+                'SELECT hops FROM jobs WHERE fighter_id = ?', (fighter_id,)).fetchone()
+            connection.execute(
+                "UPDATE jobs SET state = 'done', worker = ?, lease_expires = NULL, "
+                "error = NULL, updated_at = ? WHERE fighter_id = ?", (worker, now, fighter_id))
+            if row is not None and row[0] > 0:
+                connection.executemany(
+                    'INSERT OR IGNORE INTO jobs (fighter_id, hops, updated_at) VALUES (?, ?, ?)',
+                    ((opponent_id, row[0] - 1, now)
+                     for opponent_id in set(opponent_ids) if opponent_id is not None))
+
+    def fail(self, worker: str, fighter_id: str, error: str) -> None:
+        """Puts a fighter the worker failed to load back in the queue, or marks it failed"""
+        now = time.time()
+        with self._immediate() as connection:
+            connection.execute(
+                "UPDATE jobs SET "
+                "state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "worker = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+                "WHERE fighter_id = ? AND state = 'leased' AND worker = ?",
+                (self.max_attempts, error, now, fighter_id, worker))
+
+    def counts(self) -> Dict[str, int]:
+        """Gets the number of fighters in each state"""
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(rows)
+        return counts
+
+    def failures(self) -> Dict[str, str]:
+        """Gets the last error of each fighter marked failed"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT fighter_id, error FROM jobs WHERE state = 'failed' "
+                "ORDER BY fighter_id").fetchall()
+        return dict(rows)
+
+    def is_finished(self) -> bool:
+        """Checks whether no fighter is pending or leased"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM jobs WHERE state IN ('pending', 'leased') LIMIT 1").fetchone()
+        return row is None
+
+
+def default_worker_name() -> str:
+    """Gets a worker name unique across machines, from the host name and process id"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class QueueWorker:
+    """
+        Loads fighters claimed from a work queue until the queue is finished.
+
+        Attributes:
+            queue (WorkQueue): The queue fighters are claimed from and reported to.
+            batch (FighterBatch): The batch used to fetch claimed fighters concurrently.
+            name (str): The name leases are held under, unique per worker.
+            claim_size (int): The number of fighters claimed at a time.
+            lease_seconds (float): How long a claim lasts without being renewed.
+            poll_seconds (float): How long to wait for work while other workers hold leases.
+            loaded (int): The number of fighters this worker completed.
+
+        Leases are renewed by a background thread at a third of their length, so they
+        outlive slow pages and slow consumers but run out soon after the worker dies.
+        Workers share nothing but the queue, so throughput grows with the number of
+        workers until the queue file or the site's rate limit is the bottleneck.
+    """
+
+    def __init__(self, queue: WorkQueue, batch: Optional[FighterBatch] = None,
+                 name: Optional[str] = None, claim_size: Optional[int] = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 poll_seconds: float = 5.0) -> None:
+        """Initializes a worker, claiming four fighters per download slot by default"""
+        self.queue = queue
+        self.batch = batch or FighterBatch(pages=('history',), parse_only=True)
+        self.name = name or default_worker_name()
+        self.claim_size = claim_size or self.batch.max_workers * 4
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.loaded = 0
+        self._held: Set[str] = set()
+        self._held_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _renew_leases(self) -> None:
+        """Renews the held leases until the worker stops"""
+        while not self._stopped.wait(self.lease_seconds / 3):
+            with self._held_lock:
+                held = list(self._held)
+            if held:
+                self.queue.renew(self.name, held, self.lease_seconds)
+
+    def _release(self, fighter_id: str) -> None:
+        """Stops renewing the lease of a fighter"""
+        with self._held_lock:
+            self._held.discard(fighter_id)
+
+    def run(self, max_fighters: Optional[int] = None) -> Iterator[FighterData]:
+        """
+            Claims, loads and completes fighters until the queue is finished or
+            `max_fighters` have loaded, yielding each fighter once its pages have loaded.
+            A fighter is only completed once the caller has handled it, so a fighter the
+            caller was handling when the worker died is loaded again by another worker.
+            If the caller stops early, the fighters still claimed are handed back.
+        """
+        renewer = threading.Thread(target=self._renew_leases, daemon=True)
+        renewer.start()
+        try:
+            while max_fighters is None or self.loaded < max_fighters:
+                count = self.claim_size
+                if max_fighters is not None:
+                    count = min(count, max_fighters - self.loaded)
+                claimed = dict(self.queue.claim(self.name, count, self.lease_seconds))
+                if not claimed:
+                    if self.queue.is_finished():
+                        return
+                    self._stopped.wait(self.poll_seconds)  # Wait for leases to run out
+                    continue
+                with self._held_lock:
+                    self._held.update(claimed)
+                for fighter in self.batch.load(list(claimed)):
+                    claimed.pop(fighter.fighter_id, None)
+                    self.batch.errors.pop(fighter.fighter_id, None)  # A retry that worked
+                    yield fighter
+                    self.queue.complete(self.name, fighter.fighter_id,
+                                        fighter.get_opponent_ids())
+                    self._release(fighter.fighter_id)
+                    self.loaded += 1
+                # Fighters left over failed to load, their errors stay in batch.errors so the
+                # caller reports them
+                for fighter_id in claimed:
+                    error = self.batch.errors.get(fighter_id)
+                    self.queue.fail(self.name, fighter_id, str(error))
+                    self._release(fighter_id)
+        finally:
+            self._stopped.set()
+            renewer.join()
+            with self._held_lock:
+                held, self._held = self._held, set()
+            if held:  # The caller stopped early, so another worker can take these at once
+                self.queue.release(self.name, held)